@@ -0,0 +1,152 @@
+import numpy as np
+import pygame
+
+from clock_drag_component import Graphic
+
+# A Group of many circles stored as NumPy arrays instead of one Circle object per leaf.
+# With tens of thousands of Circle leaves, the Python loops in Group.render and in moving the
+# leaves one by one dominate the frame. ArrayGroup keeps one row per circle:
+#   xs, ys    - centres in the group's local coordinates (int32)
+#   radii     - int32
+#   colors    - (n, 3) uint8
+# so moving any subset of the circles is a single array operation, and rendering is one
+# Surface.blits() call: every distinct (radius, color) is drawn once into a small sprite, and each
+# frame the circles inside the clip area are blitted from those sprites.
+# It is a drop-in Graphic: it can be added to a Group, dragged, picked and tracked by
+# DirtyRectRenderer like any other leaf (the whole array counts as one graphic there).
+class ArrayGroup(Graphic):
+    def __init__(self, x=0, y=0):
+        # Translation of the whole group, as in Group
+        self.x = x
+        self.y = y
+        self.xs = np.zeros(0, dtype=np.int32)
+        self.ys = np.zeros(0, dtype=np.int32)
+        self.radii = np.zeros(0, dtype=np.int32)
+        self.colors = np.zeros((0, 3), dtype=np.uint8)
+        self._sprites = None     # one pre-drawn surface per distinct (radius, color)
+        self._sprite_ids = None  # index into _sprites for every circle
+
+    def __len__(self):
+        return len(self.xs)
+
+    def add_many(self, xs, ys, radii, colors):
+        # Append circles in bulk; colors is a sequence of (r, g, b).
+        # Everything is converted and checked before the arrays change, so a bad call adds nothing
+        xs = np.asarray(xs, dtype=np.int32).ravel()
+        ys = np.asarray(ys, dtype=np.int32).ravel()
+        radii = np.asarray(radii, dtype=np.int32).ravel()
+        colors = np.asarray(colors, dtype=np.uint8).reshape(-1, 3)
+        if not len(xs) == len(ys) == len(radii) == len(colors):
+            raise ValueError("xs, ys, radii and colors must have the same length")
+        self.xs = np.concatenate([self.xs, xs])
+        self.ys = np.concatenate([self.ys, ys])
+        self.radii = np.concatenate([self.radii, radii])
+        self.colors = np.concatenate([self.colors, colors])
+        self._sprites = None
+        self._changed()
+
+    def add(self, x, y, radius, color):
+        # Appending copies the arrays: prefer add_many() for more than a handful of circles
+        self.add_many([x], [y], [radius], [color])
+
+    def move(self, dx, dy):
+        # O(1), like Group.move: the circles keep their local coordinates
+        self.x += dx
+        self.y += dy
+        self._changed()
+
+    def move_circles(self, dx, dy, indices=None):
+        # Move some or all circles in one array operation. dx and dy are numbers or arrays with
+        # one value per selected circle; indices is anything NumPy accepts (a slice, a boolean
+        # mask, an array of indices without repeats), None for every circle
+        if indices is None:
+            self.xs += np.asarray(dx, dtype=np.int32)
+            self.ys += np.asarray(dy, dtype=np.int32)
+        else:
+            self.xs[indices] += np.asarray(dx, dtype=np.int32)
+            self.ys[indices] += np.asarray(dy, dtype=np.int32)
+        self._changed()
+
+    def render(self, surface, offset=(0, 0)):
+        if not len(self.xs):
+            return
+        if self._sprites is None:
+            self._build_sprites()
+        left = self.xs - self.radii + (offset[0] + self.x)
+        top = self.ys - self.radii + (offset[1] + self.y)
+        size = 2 * self.radii + 1
+        # Skip the circles outside the clip area (the whole surface, or a DirtyRectRenderer
+        # rectangle) before building the blit list
+        clip = surface.get_clip()
+        visible = np.flatnonzero((left < clip.right) & (left + size > clip.left) &
+                                 (top < clip.bottom) & (top + size > clip.top))
+        sprites = self._sprites
+        surface.blits(zip(map(sprites.__getitem__, self._sprite_ids[visible].tolist()),
+                          zip(left[visible].tolist(), top[visible].tolist())), doreturn=False)
+
+    def _build_sprites(self):
+        styles, inverse = np.unique(np.column_stack([self.radii, self.colors]), axis=0, return_inverse=True)
+        self._sprite_ids = inverse.ravel()
+        self._sprites = []
+        for radius, red, green, blue in styles.tolist():
+            # Opaque sprite with a color key for the corners: cheaper to blit than per-pixel alpha
+            key = (0, 0, 0) if (red, green, blue) == (255, 0, 255) else (255, 0, 255)
+            sprite = pygame.Surface((2 * radius + 1, 2 * radius + 1))
+            sprite.fill(key)
+            pygame.draw.circle(sprite, (red, green, blue), (radius, radius), radius)
+            sprite.set_colorkey(key, pygame.RLEACCEL)
+            self._sprites.append(sprite)
+
+    def get_rect(self):
+        if not len(self.xs):
+            return pygame.Rect(self.x, self.y, 0, 0)
+        left = int((self.xs - self.radii).min())
+        top = int((self.ys - self.radii).min())
+        right = int((self.xs + self.radii).max()) + 1
+        bottom = int((self.ys + self.radii).max()) + 1
+        return pygame.Rect(left + self.x, top + self.y, right - left, bottom - top)
+
+    def pick_index(self, pos):
+        # Index of the topmost (last added) circle containing `pos`, or None
+        dx = np.subtract(self.xs, pos[0] - self.x, dtype=np.int64)
+        dy = np.subtract(self.ys, pos[1] - self.y, dtype=np.int64)
+        hits = np.flatnonzero(dx * dx + dy * dy <= self.radii.astype(np.int64) ** 2)
+        return int(hits[-1]) if len(hits) else None
+
+    def pick(self, pos):
+        # The circles are not separate graphics, so a hit returns the ArrayGroup itself
+        return self if self.pick_index(pos) is not None else None
+
+if __name__ == "__main__":
+    import random
+    from pygame.locals import QUIT
+    from clock_drag_component import Group
+
+    # 20,000 circles drifting randomly, plus the whole field following the arrow keys
+    pygame.init()
+    screen = pygame.display.set_mode((800, 600))
+    pygame.display.set_caption("ArrayGroup")
+    scene = Group()
+    field = ArrayGroup()
+    count = 20_000
+    palette = [(255, 255, 255), (255, 0, 0), (0, 255, 0), (0, 128, 255)]
+    field.add_many([random.randrange(800) for _ in range(count)],
+                   [random.randrange(600) for _ in range(count)],
+                   [random.randrange(2, 6) for _ in range(count)],
+                   [random.choice(palette) for _ in range(count)])
+    scene.add(field)
+    clock = pygame.time.Clock()
+    rng = np.random.default_rng()
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == QUIT:
+                running = False
+        keys = pygame.key.get_pressed()
+        field.move(4 * (keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]), 4 * (keys[pygame.K_DOWN] - keys[pygame.K_UP]))
+        field.move_circles(rng.integers(-1, 2, count), rng.integers(-1, 2, count))
+        screen.fill((0, 0, 0))
+        scene.render(screen)
+        pygame.display.flip()
+        clock.tick(60)
+    pygame.quit()
@@ -0,0 +1,260 @@
+import math
+import os
+import random
+import sys
+import time
+
+# Benchmarks for the clock composite; they run without a window.
+# Run from the composite folder: python clock_benchmark.py [move|dirty|wall|pick|array|loop]
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from game_loop import GameLoop
+from clock_drag_component import (Circle, Group, Rectangle, DirtyRectRenderer, ClockHands,
+                                  create_clock_face, update_clock_hands)
+
+def random_circles(count, width=800, height=600, seed=1):
+    rng = random.Random(seed)
+    return [Circle(rng.randrange(width), rng.randrange(height), rng.randrange(2, 8),
+                   (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+            for _ in range(count)]
+
+def time_per_call(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+def bench_move(count=10_000, repeat=200):
+    # One MOUSEMOTION event while dragging a group of `count` circles
+    group = Group()
+    for circle in random_circles(count):
+        group.add(circle)
+
+    def move_every_child():
+        # What Group.move used to do: mutate each child's coordinates
+        for child in group.children:
+            child.move(1, 1)
+
+    walk = time_per_call(move_every_child, repeat)
+    transform = time_per_call(lambda: group.move(1, 1), repeat * 1000)
+    print(f"Dragging a group of {count:,} circles, per MOUSEMOTION event:")
+    print(f"  move every child   : {walk * 1e3:9.3f} ms")
+    print(f"  move the transform : {transform * 1e6:9.3f} us")
+
+def build_clock():
+    clock_group = Group()
+    clock_face = Group(cached=True)
+    create_clock_face(clock_face, 400, 300, 150, (255, 255, 255))
+    clock_group.add(clock_face)
+    hands = [Rectangle(400, 300, 5, 100, (255, 0, 0)),
+             Rectangle(400, 300, 3, 140, (0, 255, 0)),
+             Rectangle(400, 300, 1, 160, (255, 255, 255))]
+    for hand in hands:
+        clock_group.add(hand)
+    return clock_group, hands
+
+def bench_dirty(frames=600):
+    # One simulated second every 60 frames: the hands move, the other 59 frames nothing changes
+    screen = pygame.display.set_mode((800, 600))
+
+    def run(draw_frame):
+        clock_group, hands = build_clock()
+        renderer = DirtyRectRenderer(clock_group)
+        start = time.perf_counter()
+        for frame in range(frames):
+            if frame % 60 == 0:
+                second = frame // 60
+                hands[2].set_angle(-6 * second + 90)
+                hands[1].set_angle(-0.1 * second + 90)
+                hands[0].set_angle(-second / 120 + 90)
+            draw_frame(clock_group, renderer)
+        return (time.perf_counter() - start) / frames
+
+    def full_frame(clock_group, renderer):
+        screen.fill((0, 0, 0))
+        clock_group.render(screen)
+        pygame.display.flip()
+
+    def dirty_frame(clock_group, renderer):
+        pygame.display.update(renderer.render(screen))
+
+    full = run(full_frame)
+    dirty = run(dirty_frame)
+    print(f"Clock, {frames} frames at 60 FPS with the hands ticking once a second:")
+    print(f"  fill + render + flip : {full * 1e6:8.1f} us per frame")
+    print(f"  dirty rectangles     : {dirty * 1e6:8.1f} us per frame")
+    print(f"  saved                : {(full - dirty) * 1e6:8.1f} us per frame ({1 - dirty / full:.0%})")
+
+class TrigRectangle(Rectangle):
+    # A hand that computes its tip with radians/cos/sin on every call, as before the lookup table
+    def _end_point(self):
+        end_x = self.center_x + math.cos(math.radians(self.angle)) * self.length
+        end_y = self.center_y - math.sin(math.radians(self.angle)) * self.length
+        return end_x, end_y
+
+def build_wall(columns, rows, hand_class):
+    # A grid of small clocks, one Group each, positioned with the group's translation
+    wall = Group()
+    clocks = []
+    for row in range(rows):
+        for column in range(columns):
+            clock_group = Group(x=20 + column * 40, y=20 + row * 40)
+            face = Group(cached=True)
+            create_clock_face(face, 0, 0, 16, (255, 255, 255))
+            clock_group.add(face)
+            hands = [hand_class(0, 0, 3, 9, (255, 0, 0)),
+                     hand_class(0, 0, 2, 13, (0, 255, 0)),
+                     hand_class(0, 0, 1, 15, (255, 255, 255))]
+            for hand in hands:
+                clock_group.add(hand)
+            wall.add(clock_group)
+            clocks.append(hands)
+    return wall, clocks
+
+def bench_wall(columns=20, rows=15, frames=300):
+    # A world-clock wall at 60 FPS; the simulated time advances 1/60 s per frame
+    screen = pygame.display.set_mode((800, 600))
+    start_time = time.time()
+
+    # Before: every clock calls localtime() and sets its hands every frame, the hands use
+    # cos/sin, and the whole screen is redrawn
+    wall, clocks = build_wall(columns, rows, TrigRectangle)
+    start = time.perf_counter()
+    for frame in range(frames):
+        for hands in clocks:
+            update_clock_hands(*hands, time.localtime(start_time + frame / 60))
+        screen.fill((0, 0, 0))
+        wall.render(screen)
+        pygame.display.flip()
+    before = (time.perf_counter() - start) / frames
+
+    # After: one time value per frame, hands change once a second, table lookups, dirty rectangles
+    wall, clocks = build_wall(columns, rows, Rectangle)
+    clock_hands = [ClockHands(*hands, utc_offset=3600 * (i % 24 - 11)) for i, hands in enumerate(clocks)]
+    renderer = DirtyRectRenderer(wall)
+    start = time.perf_counter()
+    for frame in range(frames):
+        now = start_time + frame / 60
+        for hands in clock_hands:
+            hands.update(now)
+        pygame.display.update(renderer.render(screen))
+    after = (time.perf_counter() - start) / frames
+
+    print(f"World-clock wall of {columns * rows} clocks, {frames} frames:")
+    print(f"  per-frame updates, trig, full redraw : {before * 1e3:7.2f} ms per frame")
+    print(f"  per-second updates, table, dirty     : {after * 1e3:7.2f} ms per frame (budget at 60 FPS: 16.67 ms)")
+
+def bench_pick(count=50_000, clicks=1000):
+    group = Group()
+    for circle in random_circles(count, width=4000, height=3000):
+        group.add(circle)
+    rng = random.Random(2)
+    points = [(rng.randrange(4000), rng.randrange(3000)) for _ in range(clicks)]
+
+    def pick_linear(pos):
+        # Test every shape, topmost first
+        for child in reversed(group.children):
+            if child.pick(pos) is not None:
+                return child
+        return None
+
+    start = time.perf_counter()
+    group.pick((0, 0))  # builds the hierarchy
+    build = time.perf_counter() - start
+    assert [pick_linear(p) for p in points[:50]] == [group.pick(p) for p in points[:50]]
+    linear = time_per_call(lambda: [pick_linear(p) for p in points[:20]], 1) / 20
+    bvh = time_per_call(lambda: [group.pick(p) for p in points], 1) / clicks
+
+    # An animated scene: one shape moves between clicks, and only its path in the hierarchy is refitted
+    animated = group.children[count // 2]
+
+    def move_and_pick(pos):
+        animated.move(rng.randrange(-5, 6), rng.randrange(-5, 6))
+        return group.pick(pos)
+
+    refit = time_per_call(lambda: [move_and_pick(p) for p in points], 1) / clicks
+    print(f"Picking among {count:,} circles:")
+    print(f"  test every shape        : {linear * 1e3:8.3f} ms per click")
+    print(f"  bounding-box hierarchy  : {bvh * 1e6:8.3f} us per click (built once in {build * 1e3:.0f} ms)")
+    print(f"  ... one shape animated  : {refit * 1e6:8.3f} us per click, including the move")
+
+def bench_array(count=50_000, frames=20):
+    # Needs NumPy; the rest of the benchmarks do not
+    from clock_array_group import ArrayGroup
+
+    screen = pygame.display.set_mode((800, 600))
+    circles = random_circles(count)
+    # A small palette, as in a particle field: styles repeat, so few sprites are needed
+    palette = [(255, 255, 255), (255, 0, 0), (0, 255, 0), (0, 128, 255)]
+    for i, circle in enumerate(circles):
+        circle.color = palette[i % len(palette)]
+    group = Group()
+    for circle in circles:
+        group.add(circle)
+    array_group = ArrayGroup()
+    array_group.add_many([c.x for c in circles], [c.y for c in circles],
+                         [c.radius for c in circles], [c.color for c in circles])
+
+    screen.fill((0, 0, 0))
+    group.render(screen)
+    expected = pygame.image.tobytes(screen, "RGB")
+    screen.fill((0, 0, 0))
+    array_group.render(screen)
+    assert pygame.image.tobytes(screen, "RGB") == expected, "ArrayGroup draws different pixels"
+
+    def jitter_objects():
+        for child in group.children:
+            child.move(1, -1)
+
+    objects_render = time_per_call(lambda: group.render(screen), frames)
+    arrays_render = time_per_call(lambda: array_group.render(screen), frames)
+    objects_move = time_per_call(jitter_objects, frames)
+    arrays_move = time_per_call(lambda: array_group.move_circles(1, -1), frames)
+    print(f"{count:,} circles, per frame:")
+    print(f"  render: Circle objects {objects_render * 1e3:7.2f} ms, arrays + blits {arrays_render * 1e3:7.2f} ms")
+    print(f"  move every circle: Circle objects {objects_move * 1e3:7.2f} ms, arrays {arrays_move * 1e3:7.3f} ms")
+
+def bench_loop(seconds=1.0, step=1 / 60):
+    # Logic updates per second while each frame takes longer and longer to draw
+    print(f"{seconds:.0f} s of a {1 / step:.0f} Hz simulation:")
+    for render_ms in (1, 10, 30, 50):
+        def busy_render(alpha):
+            end = time.perf_counter() + render_ms / 1000
+            while time.perf_counter() < end:
+                pass
+
+        # Before: one update per drawn frame, clock.tick(60)
+        frames = 0
+        clock = pygame.time.Clock()
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            busy_render(0)
+            frames += 1
+            clock.tick(60)
+        coupled = frames / seconds
+
+        loop = GameLoop(lambda dt: None, busy_render, step=step, fps=60)
+        loop.handle_events = lambda: loop.stop() if time.perf_counter() - start >= seconds else None
+        start = time.perf_counter()
+        loop.run()
+        print(f"  {render_ms:2} ms per frame: update per frame {coupled:5.1f} updates/s, "
+              f"fixed step {loop.updates / seconds:5.1f} updates/s at {loop.frames / seconds:5.1f} FPS")
+
+if __name__ == "__main__":
+    pygame.init()
+    which = sys.argv[1] if len(sys.argv) > 1 else "move"
+    if which == "move":
+        bench_move()
+    elif which == "dirty":
+        bench_dirty()
+    elif which == "wall":
+        bench_wall()
+    elif which == "pick":
+        bench_pick()
+    elif which == "array":
+        bench_array()
+    elif which == "loop":
+        bench_loop()
+    pygame.quit()
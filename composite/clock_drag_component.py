@@ -3,14 +3,60 @@ from pygame.locals import *
 import math
 import time
 
+from game_loop import GameLoop
+from render_profiler import RenderProfiler
+
 # Define the base Graphic class - abstraction class
 class Graphic:
-    def render(self, surface):
+    # The Group that contains this graphic (None for the top of the tree)
+    parent = None
+    # Bounding box (in the parent's coordinates) where DirtyRectRenderer last drew this graphic
+    _drawn_rect = None
+    # On the top of a tree watched by a DirtyRectRenderer: the graphics changed since the last frame
+    _changes = None
+    # Name shown for this graphic by RenderProfiler (its class name if None)
+    label = None
+
+    # offset is added to the graphic's coordinates when drawing, so a subtree can be
+    # drawn somewhere else (e.g. into an off-screen cache surface)
+    def render(self, surface, offset=(0, 0)):
         pass
 
     def move(self, dx, dy):
         pass
 
+    def get_rect(self):
+        # Bounding box of everything this graphic draws, as a pygame.Rect
+        return pygame.Rect(0, 0, 0, 0)
+
+    def pick(self, pos):
+        # The topmost leaf drawn at `pos` (in the parent's coordinates), or None
+        return None
+
+    def _changed(self):
+        # Called after the graphic's appearance changes: tell every enclosing Group, so that any
+        # cached drawing of it is thrown away and its hit-testing index refits the changed child
+        node = self
+        while node.parent is not None:
+            child, node = node, node.parent
+            node._cache = None
+            if node._bvh is not None:
+                node._bvh_dirty.add(child)
+        # `node` is now the top of the tree; record the change for the dirty-rectangle renderer
+        if node._changes is not None:
+            node._changes.append(self)
+
+    def world_rect(self, rect=None):
+        # `rect` (default: get_rect()) converted from the parent's coordinates to screen coordinates
+        rect = self.get_rect() if rect is None else rect
+        dx = dy = 0
+        node = self.parent
+        while node is not None:
+            dx += node.x
+            dy += node.y
+            node = node.parent
+        return rect.move(dx, dy)
+
 # Circle class remains the same - leaf element
 class Circle(Graphic):
     def __init__(self, x, y, radius, color):
@@ -19,12 +65,26 @@ class Circle(Graphic):
         self.radius = radius
         self.color = color
 
-    def render(self, surface):
-        pygame.draw.circle(surface, self.color, (self.x, self.y), self.radius)
+    def render(self, surface, offset=(0, 0)):
+        pygame.draw.circle(surface, self.color, (self.x + offset[0], self.y + offset[1]), self.radius)
 
     def move(self, dx, dy):
         self.x += dx
         self.y += dy
+        self._changed()
+
+    def get_rect(self):
+        return pygame.Rect(self.x - self.radius, self.y - self.radius, 2 * self.radius + 1, 2 * self.radius + 1)
+
+    def pick(self, pos):
+        dx, dy = pos[0] - self.x, pos[1] - self.y
+        return self if dx * dx + dy * dy <= self.radius * self.radius else None
+
+# Unit vectors for angles quantized to 0.1 degree (screen y grows downwards, hence -sin).
+# At the length of a clock hand the rounding moves the tip by well under a pixel.
+ANGLE_STEPS = 3600
+UNIT_VECTORS = [(math.cos(2 * math.pi * step / ANGLE_STEPS), -math.sin(2 * math.pi * step / ANGLE_STEPS))
+                for step in range(ANGLE_STEPS)]
 
 # Rectangle class with logic for the clock hands - leaf element
 class Rectangle(Graphic):
@@ -36,34 +96,294 @@ class Rectangle(Graphic):
         self.color = color
         self.angle = angle
 
-    def render(self, surface):
-        end_x = self.center_x + math.cos(math.radians(self.angle)) * self.length
-        end_y = self.center_y - math.sin(math.radians(self.angle)) * self.length
-        pygame.draw.line(surface, self.color, (self.center_x, self.center_y), (end_x, end_y), self.width)
+    def _end_point(self):
+        # Direction comes from the precomputed table instead of radians/cos/sin on every frame
+        dx, dy = UNIT_VECTORS[round(self.angle * ANGLE_STEPS / 360) % ANGLE_STEPS]
+        return self.center_x + dx * self.length, self.center_y + dy * self.length
+
+    def render(self, surface, offset=(0, 0)):
+        end_x, end_y = self._end_point()
+        ox, oy = offset
+        pygame.draw.line(surface, self.color, (self.center_x + ox, self.center_y + oy),
+                         (end_x + ox, end_y + oy), self.width)
 
     def move(self, dx, dy):
         self.center_x += dx
         self.center_y += dy
+        self._changed()
 
     def set_angle(self, angle):
-        self.angle = angle
+        if angle != self.angle:
+            self.angle = angle
+            self._changed()
+
+    def get_rect(self):
+        end_x, end_y = self._end_point()
+        left, right = min(self.center_x, end_x), max(self.center_x, end_x)
+        top, bottom = min(self.center_y, end_y), max(self.center_y, end_y)
+        rect = pygame.Rect(int(left), int(top), int(right - left) + 2, int(bottom - top) + 2)
+        # Wide enough for the line and for the slack pick() allows around it
+        return rect.inflate(self.width + 6, self.width + 6)
+
+    def pick(self, pos):
+        # Hit if the point is within half the line width (plus a little slack) of the segment
+        end_x, end_y = self._end_point()
+        seg_x, seg_y = end_x - self.center_x, end_y - self.center_y
+        px, py = pos[0] - self.center_x, pos[1] - self.center_y
+        length_sq = seg_x * seg_x + seg_y * seg_y
+        t = 0.0 if length_sq == 0 else max(0.0, min(1.0, (px * seg_x + py * seg_y) / length_sq))
+        dx, dy = px - t * seg_x, py - t * seg_y
+        reach = self.width / 2 + 2
+        return self if dx * dx + dy * dy <= reach * reach else None
 
 # Group class
 class Group(Graphic):
-    def __init__(self):
+    # A group has its own translation (x, y): children are stored in the group's local
+    # coordinates and drawn relative to it, so moving a group only changes two numbers
+    # instead of touching every child (like a transform node in a scene graph).
+    # cached=True is meant for static subtrees (like the clock face): the children are drawn once
+    # into an off-screen surface and every later frame is a single blit of that surface.
+    # The cache is dropped whenever a child changes, and rebuilt on the next render.
+    def __init__(self, cached=False, x=0, y=0):
         self.children = []
+        self.x = x
+        self.y = y
+        self.cached = cached
+        self._cache = None       # off-screen surface with the children drawn on it
+        self._cache_rect = None  # where that surface goes, in the group's local coordinates
+        self._bvh = None         # bounding-volume hierarchy over the children, built by pick()
+        self._bvh_items = None   # id(child) -> its [rect, index, leaf] entry in the hierarchy
+        self._bvh_dirty = set()  # children whose box changed since the hierarchy was refitted
 
     # we add graphical elements into our group
     def add(self, graphic):
+        graphic.parent = self
+        graphic._changes = None  # only the top of the tree records changes
         self.children.append(graphic)
+        self._cache = None
+        self._bvh = None  # the hierarchy is rebuilt on the next pick()
+        self._changed()
 
-    def render(self, surface):
-        for child in self.children:
-            child.render(surface)
+    def render(self, surface, offset=(0, 0)):
+        offset = (offset[0] + self.x, offset[1] + self.y)
+        if not self.cached:
+            for child in self.children:
+                child.render(surface, offset)
+            return
+        if self._cache is None:
+            self._cache_rect = self._local_rect()
+            self._cache = pygame.Surface(self._cache_rect.size, pygame.SRCALPHA)
+            for child in self.children:
+                child.render(self._cache, (-self._cache_rect.x, -self._cache_rect.y))
+            # Run-length encode the mostly transparent surface: blitting it becomes a few
+            # microseconds instead of alpha-blending every pixel of the bounding box
+            self._cache.set_alpha(255, pygame.RLEACCEL)
+        surface.blit(self._cache, (self._cache_rect.x + offset[0], self._cache_rect.y + offset[1]))
 
     def move(self, dx, dy):
-        for child in self.children:
-            child.move(dx, dy)
+        # O(1): the children keep their local coordinates, and a cached drawing stays valid
+        self.x += dx
+        self.y += dy
+        self._changed()
+
+    def pick(self, pos):
+        # Resolve a click to the topmost leaf under it. The children's bounding boxes are kept in
+        # a bounding-volume hierarchy (built on first use, in local coordinates so moving the
+        # group does not invalidate it), so only the few children whose boxes contain the point
+        # are tested instead of every child: O(log n) for well spread-out shapes.
+        # When a child changes, only its box and the boxes on the path above it are refitted
+        # (on the next pick); adding a child rebuilds this group's hierarchy
+        x, y = pos[0] - self.x, pos[1] - self.y
+        self._refit()
+        # Children added later are drawn on top, so try the candidates from the last one back
+        for index in sorted(_query_bvh(self._bvh, x, y), reverse=True):
+            hit = self.children[index].pick((x, y))
+            if hit is not None:
+                return hit
+        return None
+
+    def _refit(self):
+        # Build the hierarchy if needed, or bring the boxes of the changed children up to date
+        if self._bvh is None:
+            items = [[child.get_rect(), index, None] for index, child in enumerate(self.children)]
+            self._bvh = _build_bvh(items)
+            self._bvh_items = {id(child): item for child, item in zip(self.children, items)}
+            self._bvh_dirty = set()
+            return
+        for child in self._bvh_dirty:
+            item = self._bvh_items[id(child)]
+            item[0] = child.get_rect()
+            _refit_bvh(item[2])
+        self._bvh_dirty.clear()
+
+    def _local_rect(self):
+        # Bounding box of the children in the group's own coordinates
+        if not self.children:
+            return pygame.Rect(0, 0, 0, 0)
+        return self.children[0].get_rect().unionall([child.get_rect() for child in self.children[1:]])
+
+    def get_rect(self):
+        if self._bvh is not None:
+            # The root of the refitted hierarchy is the children's bounding box, without a walk
+            self._refit()
+            return self._bvh.rect.move(self.x, self.y)
+        return self._local_rect().move(self.x, self.y)
+
+# Bounding-volume hierarchy used by Group.pick: a binary tree of rectangles where each node's
+# box encloses everything below it, and leaves hold up to BVH_LEAF_SIZE [rect, child index, leaf]
+# entries (each entry points back to its leaf, and each node to its parent, for refitting)
+BVH_LEAF_SIZE = 8
+
+class _BVHNode:
+    __slots__ = ("rect", "items", "left", "right", "parent")
+
+    def __init__(self, rect, items=None, left=None, right=None):
+        self.rect = rect
+        self.items = items
+        self.left = left
+        self.right = right
+        self.parent = None
+
+def _build_bvh(items):
+    if not items:
+        return None
+    rect = items[0][0].unionall([item[0] for item in items[1:]])
+    if len(items) <= BVH_LEAF_SIZE:
+        node = _BVHNode(rect, items)
+        for item in items:
+            item[2] = node
+        return node
+    # Split at the median along the longer side of the box
+    if rect.width >= rect.height:
+        items = sorted(items, key=lambda item: item[0].centerx)
+    else:
+        items = sorted(items, key=lambda item: item[0].centery)
+    middle = len(items) // 2
+    node = _BVHNode(rect, left=_build_bvh(items[:middle]), right=_build_bvh(items[middle:]))
+    node.left.parent = node.right.parent = node
+    return node
+
+def _refit_bvh(leaf):
+    # Recompute the boxes from `leaf` up to the root after one of its entries changed: O(log n).
+    # Stops early once a box comes out unchanged, since nothing above it can change either
+    items = leaf.items
+    rect = items[0][0].unionall([item[0] for item in items[1:]])
+    node = leaf
+    while node is not None:
+        if node is not leaf:
+            rect = node.left.rect.union(node.right.rect)
+        if rect == node.rect:
+            return
+        node.rect = rect
+        node = node.parent
+
+def _query_bvh(root, x, y):
+    # Indices of the items whose rectangles contain (x, y)
+    found = []
+    stack = [root] if root is not None else []
+    while stack:
+        node = stack.pop()
+        if not node.rect.collidepoint(x, y):
+            continue
+        if node.items is not None:
+            found.extend(index for rect, index, _ in node.items if rect.collidepoint(x, y))
+        else:
+            stack.append(node.left)
+            stack.append(node.right)
+    return found
+
+# Redraws only the parts of the screen that changed since the previous frame.
+# Every change to a graphic (move, set_angle, add) is recorded on the top of the tree; each frame
+# the renderer erases the area where a changed graphic was drawn before, draws the tree again
+# clipped to its old and new bounding boxes, and returns those rectangles for
+# pygame.display.update(), so a frame where nothing changed costs (almost) nothing.
+# A line cut by the edge of a dirty rectangle can be rasterised a pixel differently than when it
+# was drawn whole; such a seam disappears the next time that area is redrawn.
+class DirtyRectRenderer:
+    def __init__(self, root, background=(0, 0, 0), max_changes=16):
+        self.root = root
+        self.background = background
+        # More changed graphics than this in one frame and the whole screen is redrawn instead
+        self.max_changes = max_changes
+        self._full_redraw = True
+        root._changes = []
+
+    def invalidate(self):
+        # Redraw the whole screen on the next frame
+        self._full_redraw = True
+
+    def render(self, surface):
+        # Bring `surface` up to date; returns the list of rectangles that were redrawn
+        if self._full_redraw:
+            self._full_redraw = False
+            self.root._changes.clear()
+            surface.fill(self.background)
+            self.root.render(surface)
+            self._remember_all(self.root)
+            return [surface.get_rect()]
+
+        changes = self.root._changes
+        if not changes:
+            return []
+        self.root._changes = []
+        changed = list({id(g): g for g in changes}.values())
+        if len(changed) > self.max_changes:
+            # Each dirty rectangle means another pass over the tree; past a point one full
+            # redraw is cheaper
+            self._full_redraw = True
+            return self.render(surface)
+        dirty = []
+        for graphic in changed:
+            if graphic._drawn_rect is not None:
+                dirty.append(graphic.world_rect(graphic._drawn_rect))
+            new_rect = graphic.get_rect()
+            dirty.append(graphic.world_rect(new_rect))
+            graphic._drawn_rect = new_rect
+            self._grow_ancestors(graphic, new_rect)
+        dirty = self._merge(dirty)
+        for rect in dirty:
+            surface.set_clip(rect)
+            surface.fill(self.background)
+            self.root.render(surface)
+        surface.set_clip(None)
+        return dirty
+
+    @staticmethod
+    def _grow_ancestors(graphic, rect):
+        # The groups above `graphic` now also cover `rect` (given in graphic's parent coordinates).
+        # Their recorded boxes only grow until the next full redraw: recomputing each group's exact
+        # box would cost a walk of its subtree, and a box that is too big only means a larger
+        # area is repainted when the group moves
+        node = graphic.parent
+        while node is not None:
+            rect = rect.move(node.x, node.y)
+            node._drawn_rect = rect if node._drawn_rect is None else node._drawn_rect.union(rect)
+            node = node.parent
+
+    def _remember_all(self, graphic):
+        # After a full redraw every graphic's bounding box is where it was drawn
+        stack = [graphic]
+        while stack:
+            graphic = stack.pop()
+            graphic._drawn_rect = graphic.get_rect()
+            stack.extend(getattr(graphic, "children", ()))
+
+    @staticmethod
+    def _merge(rects):
+        # Union overlapping rectangles so no area is redrawn twice
+        merged = []
+        for rect in rects:
+            if rect.width <= 0 or rect.height <= 0:
+                continue
+            rect = rect.inflate(2, 2)
+            overlaps = [other for other in merged if other.colliderect(rect)]
+            while overlaps:
+                for other in overlaps:
+                    merged.remove(other)
+                rect = rect.unionall(overlaps)
+                overlaps = [other for other in merged if other.colliderect(rect)]
+            merged.append(rect)
+        return merged
 
 # Function to create the clock face with hour circles
 # 12 circles corresponding to 12 hours
@@ -75,8 +395,9 @@ def create_clock_face(group, center_x, center_y, radius, color):
         group.add(Circle(x, y, 10, color))
 
 # Function to update the clock hands - 3 hands
-def update_clock_hands(hour_hand, minute_hand, second_hand):
-    current_time = time.localtime()
+def update_clock_hands(hour_hand, minute_hand, second_hand, current_time=None):
+    if current_time is None:
+        current_time = time.localtime()
     hour = current_time.tm_hour % 12 + current_time.tm_min / 60
     minute = current_time.tm_min + current_time.tm_sec / 60
     second = current_time.tm_sec
@@ -86,55 +407,128 @@ def update_clock_hands(hour_hand, minute_hand, second_hand):
     minute_hand.set_angle(-360 * minute / 60 + 90)
     second_hand.set_angle(-360 * second / 60 + 90)
 
-# Initialize Pygame
-pygame.init()
-screen = pygame.display.set_mode((800, 600))
-pygame.display.set_caption('Smooth Draggable Clock')
-clock = pygame.time.Clock()  # Pygame clock for controlling the frame rate
-
-# Create the clock face and hands
-clock_group = Group()
-create_clock_face(clock_group, 400, 300, 150, (255, 255, 255))  # White circles for hours
-hour_hand = Rectangle(400, 300, 5, 100, (255, 0, 0), 0)  # Red hour hand
-minute_hand = Rectangle(400, 300, 3, 140, (0, 255, 0), 0)  # Green minute hand
-second_hand = Rectangle(400, 300, 1, 160, (255, 255, 255), 0)  # White second hand
-clock_group.add(hour_hand)
-clock_group.add(minute_hand)
-clock_group.add(second_hand)
-
-# Dragging variables
-dragging = False
-last_mouse_pos = (0, 0)
-
-# Game loop
-running = True
-while running:
-    for event in pygame.event.get():
-        if event.type == QUIT:
-            running = False
-
-        elif event.type == MOUSEBUTTONDOWN:
-            dragging = True
-            last_mouse_pos = event.pos
-
-        elif event.type == MOUSEBUTTONUP:
-            dragging = False
-
-        elif event.type == MOUSEMOTION and dragging:
-            current_mouse_pos = event.pos
-            dx = current_mouse_pos[0] - last_mouse_pos[0]
-            dy = current_mouse_pos[1] - last_mouse_pos[1]
-            clock_group.move(dx, dy)
-            last_mouse_pos = current_mouse_pos
-
-    # Update the clock hands only if not dragging for smoother dragging experience
-    if not dragging:
-        update_clock_hands(hour_hand, minute_hand, second_hand)
-
-    screen.fill((0, 0, 0))  # Clear the screen
-    clock_group.render(screen)  # Render the clock
-
-    pygame.display.flip()
-    clock.tick(60)  # Cap the frame rate to 60 frames per second
-
-pygame.quit()
+# The three hands of one clock. The hands only move once a second, so update() does the
+# time conversion and sets the angles only when the displayed second changes; the rest of the
+# frames cost one comparison. Many clocks (e.g. a world-clock wall) can share one time.time()
+# call per frame, each with its own UTC offset.
+class ClockHands:
+    def __init__(self, hour_hand, minute_hand, second_hand, utc_offset=None):
+        self.hands = (hour_hand, minute_hand, second_hand)
+        self.utc_offset = utc_offset  # seconds east of UTC, None for the local time zone
+        self._shown_second = None
+
+    def update(self, now=None):
+        second = int(time.time() if now is None else now)
+        if second == self._shown_second:
+            return False
+        self._shown_second = second
+        if self.utc_offset is None:
+            current_time = time.localtime(second)
+        else:
+            current_time = time.gmtime(second + self.utc_offset)
+        update_clock_hands(*self.hands, current_time)
+        return True
+
+def main():
+    # Initialize Pygame
+    pygame.init()
+    screen = pygame.display.set_mode((800, 600))
+    pygame.display.set_caption('Smooth Draggable Clock')
+
+    # Create the clock face and hands
+    # The face never changes, so it lives in its own cached group and is drawn with one blit per frame
+    clock_group = Group()
+    clock_face = Group(cached=True)
+    clock_face.label = "clock face"
+    create_clock_face(clock_face, 400, 300, 150, (255, 255, 255))  # White circles for hours
+    clock_group.add(clock_face)
+    hour_hand = Rectangle(400, 300, 5, 100, (255, 0, 0), 0)  # Red hour hand
+    minute_hand = Rectangle(400, 300, 3, 140, (0, 255, 0), 0)  # Green minute hand
+    second_hand = Rectangle(400, 300, 1, 160, (255, 255, 255), 0)  # White second hand
+    hour_hand.label, minute_hand.label, second_hand.label = "hour hand", "minute hand", "second hand"
+    clock_group.add(hour_hand)
+    clock_group.add(minute_hand)
+    clock_group.add(second_hand)
+    clock_hands = ClockHands(hour_hand, minute_hand, second_hand)
+
+    # Only the changed parts of the screen are redrawn and sent to the display
+    renderer = DirtyRectRenderer(clock_group, (0, 0, 0))
+    # F3 toggles the render profiler overlay; the timings are saved as a flame graph input on exit
+    profiler = RenderProfiler(Graphic)
+
+    # Dragging variables
+    dragging = False
+    last_mouse_pos = (0, 0)
+
+    def on_clock(pos):
+        # pick() only hits the hour dots and the hands, so a click on the empty face between them
+        # is tested against the disc the dots lie on (the face's box is in clock_group's coordinates)
+        if clock_group.pick(pos) is not None:
+            return True
+        face = clock_face.get_rect().move(clock_group.x, clock_group.y)
+        dx, dy = pos[0] - face.centerx, pos[1] - face.centery
+        return dx * dx + dy * dy <= (face.width / 2) ** 2
+
+    # Input is handled every frame so dragging follows the mouse at the frame rate
+    def handle_events():
+        nonlocal dragging, last_mouse_pos
+        for event in pygame.event.get():
+            if event.type == QUIT:
+                loop.stop()
+
+            elif event.type == MOUSEBUTTONDOWN:
+                # Only start dragging when the click lands on the clock itself
+                if on_clock(event.pos):
+                    dragging = True
+                    last_mouse_pos = event.pos
+
+            elif event.type == MOUSEBUTTONUP:
+                dragging = False
+
+            elif event.type == KEYDOWN and event.key == K_F3:
+                if profiler.recording:
+                    profiler.stop()
+                    renderer.invalidate()  # wipe the overlay
+                else:
+                    profiler.start()
+
+            elif event.type == MOUSEMOTION and dragging:
+                current_mouse_pos = event.pos
+                dx = current_mouse_pos[0] - last_mouse_pos[0]
+                dy = current_mouse_pos[1] - last_mouse_pos[1]
+                clock_group.move(dx, dy)
+                last_mouse_pos = current_mouse_pos
+
+    # The clock logic runs in fixed steps, however fast or slow the frames are drawn
+    def update(step):
+        # Update the clock hands only if not dragging for smoother dragging experience
+        if not dragging:
+            clock_hands.update()
+
+    # The hands jump from one second to the next, so there is nothing to interpolate (alpha unused)
+    def render(alpha):
+        # Redraw what changed (the hands once a second, the whole clock while dragging).
+        # While profiling, every frame is a full redraw: most frames would otherwise draw nothing
+        # and the per-frame averages would be mostly idle frames
+        if profiler.recording:
+            renderer.invalidate()
+        dirty = renderer.render(screen)
+        if profiler.recording:
+            profiler.end_frame()
+            dirty.append(profiler.draw_overlay(screen))
+        pygame.display.update(dirty)
+
+    # Game loop: the logic ten times a second (plenty for a hand that moves once a second),
+    # frames capped at 60 per second
+    clock_hands.update()  # show the right time from the first frame
+    loop = GameLoop(update, render, handle_events, step=0.1, fps=60)
+    loop.run()
+
+    pygame.quit()
+    if profiler.frames:
+        profiler.write_folded("clock_render.folded")
+        print("\n".join(profiler.report()))
+        print("Flame graph input written to clock_render.folded")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import contextlib
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from file_system_component import File, Directory
+from file_system_columnar import ColumnarTree
+from file_system_snapshot import Snapshot, write_snapshot
+from file_system_diff import diff_trees
+from file_system_renderer import render
+
+# Benchmarks for the composite file system.
+# Run from the composite folder: python file_system_benchmark.py
+
+def build_tree(depth, fanout, files_per_dir):
+    # Build a balanced tree: every directory holds `files_per_dir` files and `fanout` sub-directories
+    root = Directory("root")
+    level = [root]
+    for d in range(depth):
+        next_level = []
+        for directory in level:
+            for i in range(files_per_dir):
+                directory.add(File(f"file{i}.txt", 100 + i))
+            if d < depth - 1:
+                for i in range(fanout):
+                    sub = Directory(f"dir{i}")
+                    directory.add(sub)
+                    next_level.append(sub)
+        level = next_level
+    return root
+
+def build_columnar(depth, fanout, files_per_dir):
+    # Same shape as build_tree(), written straight into a ColumnarTree
+    tree = ColumnarTree("root")
+    level = [0]
+    for d in range(depth):
+        next_level = []
+        for directory in level:
+            for i in range(files_per_dir):
+                tree.add_file(directory, f"file{i}.txt", 100 + i)
+            if d < depth - 1:
+                for i in range(fanout):
+                    next_level.append(tree.add_directory(directory, f"dir{i}"))
+        level = next_level
+    return tree
+
+def recursive_size(component):
+    # The original get_size(): walk the whole subtree on every call
+    if isinstance(component, File):
+        return component.size
+    return sum(recursive_size(child) for child in component.children)
+
+def count_nodes(component):
+    if isinstance(component, File):
+        return 1
+    return 1 + sum(count_nodes(child) for child in component.children)
+
+def time_it(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+def bench_cached_size(depth=6, fanout=8, files_per_dir=4, repeat=20):
+    root = build_tree(depth, fanout, files_per_dir)
+    assert root.get_size() == recursive_size(root)
+    print(f"Tree with {count_nodes(root):,} nodes")
+
+    walk = time_it(lambda: recursive_size(root), repeat)
+    cached = time_it(root.get_size, repeat * 1000)
+    print(f"  recursive walk : {walk * 1e3:10.3f} ms per get_size()")
+    print(f"  cached size    : {cached * 1e6:10.3f} us per get_size()")
+
+    # Resizing a deep file only touches its ancestors
+    deepest = root
+    while any(isinstance(child, Directory) for child in deepest.children):
+        deepest = next(child for child in deepest.children if isinstance(child, Directory))
+    leaf = next(iter(deepest.children))
+    resize = time_it(lambda: setattr(leaf, "size", leaf.size + 1), repeat * 1000)
+    print(f"  file resize    : {resize * 1e6:10.3f} us per update (depth {depth})")
+    assert root.get_size() == recursive_size(root)
+
+def measure_memory(build, *args):
+    # Bytes allocated while building (and still held by) the tree
+    tracemalloc.start()
+    tree = build(*args)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return tree, current
+
+def bench_memory(object_depth=7, columnar_depth=8, fanout=8, files_per_dir=4):
+    # The object tree is measured at a smaller size (at 10M nodes it needs several GB),
+    # the columnar tree at ~10M nodes; both are reported per node
+    tree, used = measure_memory(build_tree, object_depth, fanout, files_per_dir)
+    nodes = count_nodes(tree)
+    del tree
+    print(f"File/Directory objects: {nodes:,} nodes, {used / 2**20:,.0f} MiB, {used / nodes:.0f} bytes/node")
+
+    tree, used = measure_memory(build_columnar, columnar_depth, fanout, files_per_dir)
+    nodes = len(tree)
+    print(f"ColumnarTree:           {nodes:,} nodes, {used / 2**20:,.0f} MiB, {used / nodes:.0f} bytes/node "
+          f"({tree.nbytes() / nodes:.0f} in columns, {len(tree.names)} distinct names)")
+
+def bench_snapshot(depth=7, fanout=8, files_per_dir=4):
+    # Opening a snapshot maps the file and reads the header, so it does not grow with the node count
+    root = build_tree(depth, fanout, files_per_dir)
+    path = os.path.join(tempfile.gettempdir(), "benchmark.fssnap")
+    start = time.perf_counter()
+    nodes = write_snapshot(root, path)
+    written = time.perf_counter() - start
+    print(f"Snapshot of {nodes:,} nodes: {os.path.getsize(path) / 2**20:,.0f} MiB written in {written:.1f}s")
+
+    start = time.perf_counter()
+    with Snapshot(path) as snapshot:
+        size = snapshot.root.get_size()
+        first_files = [name for _, name in zip(range(10), snapshot.root.iter_files())]
+        answered = time.perf_counter() - start
+    assert size == root.get_size() and first_files == root.list_files()[:10]
+    print(f"  open + get_size + first 10 files: {answered * 1e3:.2f} ms")
+    os.remove(path)
+
+def bench_diff(depth=7, fanout=8, files_per_dir=4, changes=10):
+    old = build_tree(depth, fanout, files_per_dir)
+    new = build_tree(depth, fanout, files_per_dir)
+    print(f"Two trees of {count_nodes(old):,} nodes")
+
+    start = time.perf_counter()
+    assert not list(diff_trees(old, new))
+    print(f"  first diff (computes every digest): {(time.perf_counter() - start) * 1e3:10.1f} ms")
+
+    # Resize a few files deep in the new tree; only their ancestors lose their digests
+    paths = ["/" + "/".join(f"dir{(i // fanout ** d) % fanout}" for d in range(depth - 1)) + "/file0.txt"
+             for i in range(changes)]
+    for path in paths:
+        new.lookup(path).size += 1
+    start = time.perf_counter()
+    found = list(diff_trees(old, new))
+    print(f"  diff after {changes} resizes:           {(time.perf_counter() - start) * 1e3:10.1f} ms")
+    assert len(found) == changes
+
+def bench_render(depth=6, fanout=8, files_per_dir=4):
+    root = build_tree(depth, fanout, files_per_dir)
+    print(f"Rendering {count_nodes(root):,} nodes to {os.devnull}")
+    with open(os.devnull, "w") as devnull:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(devnull):
+            root.display()
+        print(f"  {'display()':14}: {(time.perf_counter() - start) * 1e3:8.1f} ms")
+        for fmt in ("text", "jsonl", "du"):
+            start = time.perf_counter()
+            render(root, devnull, fmt)
+            print(f"  {f'render({fmt})':14}: {(time.perf_counter() - start) * 1e3:8.1f} ms")
+
+if __name__ == "__main__":
+    # python file_system_benchmark.py [size|memory|snapshot|diff|render]
+    which = sys.argv[1] if len(sys.argv) > 1 else "size"
+    if which == "size":
+        bench_cached_size()
+    elif which == "memory":
+        bench_memory()
+    elif which == "snapshot":
+        bench_snapshot()
+    elif which == "diff":
+        bench_diff()
+    elif which == "render":
+        bench_render()
@@ -0,0 +1,211 @@
+from array import array
+
+from file_system_component import Directory, walk_preorder
+
+# Compact, array-backed alternative to a tree of File/Directory objects.
+# Every node is a row index into a set of typed columns instead of a Python object,
+# so a node costs a few dozen bytes instead of several hundred:
+#   kind          'b'  FILE or DIRECTORY
+#   name_id       'i'  index into an interned string table (repeated names are stored once)
+#   parent        'i'  row of the parent directory (-1 for the root)
+#   first_child   'i'  first child row, or -1
+#   last_child    'i'  last child row, or -1 (lets us append children in O(1))
+#   next_sibling  'i'  next row with the same parent, or -1
+#   size          'q'  file size, or the cached total size of a directory's subtree
+# ColumnarNode exposes the same display/get_size/list_files API as File/Directory on top of a row,
+# plus read-only name/parent/path/children. It is a view, not a FileSystemComponent: the tree is
+# changed through ColumnarTree (add_file/add_directory), never through the nodes.
+
+FILE = 0
+DIRECTORY = 1
+
+class StringTable:
+    def __init__(self):
+        self._ids = {}
+        self.strings = []
+
+    def intern(self, string):
+        # Return the id of `string`, adding it to the table the first time it is seen
+        string_id = self._ids.get(string)
+        if string_id is None:
+            string_id = len(self.strings)
+            self._ids[string] = string_id
+            self.strings.append(string)
+        return string_id
+
+    def __getitem__(self, string_id):
+        return self.strings[string_id]
+
+    def __len__(self):
+        return len(self.strings)
+
+class ColumnarTree:
+    def __init__(self, root_name="root"):
+        self.names = StringTable()
+        self.kind = array("b")
+        self.name_id = array("i")
+        self.parent = array("i")
+        self.first_child = array("i")
+        self.last_child = array("i")
+        self.next_sibling = array("i")
+        self.size = array("q")
+        # Row 0 is always the root directory
+        self._append(-1, root_name, DIRECTORY, 0)
+
+    def __len__(self):
+        return len(self.kind)
+
+    @property
+    def root(self):
+        return ColumnarNode(self, 0)
+
+    def _append(self, parent, name, kind, size):
+        # Add a row and link it as the last child of `parent`; does not touch ancestor sizes
+        index = len(self.kind)
+        self.kind.append(kind)
+        self.name_id.append(self.names.intern(name))
+        self.parent.append(parent)
+        self.first_child.append(-1)
+        self.last_child.append(-1)
+        self.next_sibling.append(-1)
+        self.size.append(size)
+        if parent >= 0:
+            if self.first_child[parent] == -1:
+                self.first_child[parent] = index
+            else:
+                self.next_sibling[self.last_child[parent]] = index
+            self.last_child[parent] = index
+        return index
+
+    def add_directory(self, parent, name):
+        if self.kind[parent] != DIRECTORY:
+            raise ValueError(f"{self.names[self.name_id[parent]]} is not a directory")
+        return self._append(parent, name, DIRECTORY, 0)
+
+    def add_file(self, parent, name, size):
+        if self.kind[parent] != DIRECTORY:
+            raise ValueError(f"{self.names[self.name_id[parent]]} is not a directory")
+        index = self._append(parent, name, FILE, size)
+        # Keep the cached directory sizes correct, as Directory.add does
+        node = parent
+        while node >= 0:
+            self.size[node] += size
+            node = self.parent[node]
+        return index
+
+    def children(self, index):
+        child = self.first_child[index]
+        while child != -1:
+            yield child
+            child = self.next_sibling[child]
+
+    def walk(self, index=0):
+        # Pre-order walk yielding (depth, row) using only the link columns: O(1) extra memory
+        yield 0, index
+        depth = 0
+        node = self.first_child[index]
+        if node != -1:
+            depth = 1
+        while node != -1:
+            yield depth, node
+            if self.first_child[node] != -1:
+                node = self.first_child[node]
+                depth += 1
+                continue
+            # Climb until we find an unvisited sibling, never leaving the starting subtree
+            while node != index and self.next_sibling[node] == -1:
+                node = self.parent[node]
+                depth -= 1
+            if node == index:
+                break
+            node = self.next_sibling[node]
+
+    def nbytes(self):
+        # Bytes held by the columns and the string table's characters
+        columns = (self.kind, self.name_id, self.parent, self.first_child,
+                   self.last_child, self.next_sibling, self.size)
+        return sum(column.buffer_info()[1] * column.itemsize for column in columns)
+
+    @classmethod
+    def from_component(cls, component):
+        # Convert a File/Directory tree into columns (sizes are copied from the cached totals)
+        tree = cls(component.name)
+        tree.size[0] = component.get_size()
+        rows = [0]  # rows[depth] = row of the most recent directory seen at that depth
+        walker = walk_preorder(component)
+        next(walker)
+        for depth, node in walker:
+            kind = DIRECTORY if isinstance(node, Directory) else FILE
+            index = tree._append(rows[depth - 1], node.name, kind, node.get_size())
+            if kind == DIRECTORY:
+                del rows[depth:]
+                rows.append(index)
+        return tree
+
+class ColumnarNode:
+    # Lightweight view of one row; created on demand, so the tree itself holds no node objects
+    def __init__(self, tree, index):
+        self.tree = tree
+        self.index = index
+
+    @property
+    def name(self):
+        return self.tree.names[self.tree.name_id[self.index]]
+
+    @property
+    def is_directory(self):
+        return self.tree.kind[self.index] == DIRECTORY
+
+    @property
+    def parent(self):
+        parent = self.tree.parent[self.index]
+        return ColumnarNode(self.tree, parent) if parent >= 0 else None
+
+    @property
+    def path(self):
+        # "/"-separated path from the root, which itself is "/", as for File/Directory
+        tree = self.tree
+        names = []
+        row = self.index
+        while tree.parent[row] >= 0:
+            names.append(tree.names[tree.name_id[row]])
+            row = tree.parent[row]
+        return "/" + "/".join(reversed(names))
+
+    @property
+    def children(self):
+        return [ColumnarNode(self.tree, child) for child in self.tree.children(self.index)]
+
+    def display(self, current_indent=""):
+        tree = self.tree
+        for depth, row in tree.walk(self.index):
+            indent = current_indent + "-" * depth
+            name = tree.names[tree.name_id[row]]
+            if tree.kind[row] == DIRECTORY:
+                print(f"{indent} Directory: {name}")
+            else:
+                print(f"{indent} File: {name}, Size: {tree.size[row]} bytes")
+
+    def get_size(self):
+        return self.tree.size[self.index]
+
+    def list_files(self):
+        return list(self.iter_files())
+
+    def iter_files(self):
+        tree = self.tree
+        for _, row in tree.walk(self.index):
+            if tree.kind[row] == FILE:
+                yield tree.names[tree.name_id[row]]
+
+if __name__ == "__main__":
+    tree = ColumnarTree("dir1")
+    tree.add_file(0, "file1.txt", 1200)
+    tree.add_file(0, "file2.txt", 1500)
+    dir2 = tree.add_directory(0, "dir2")
+    tree.add_file(dir2, "file3.txt", 1000)
+
+    tree.root.display()
+    print(f"Total size of {tree.root.name}: {tree.root.get_size()} bytes")
+    print(tree.root.list_files())
+    print(tree.root.children[2].children[0].path)
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from collections import deque
 
 # Define an abstract base class for all file system components
 class FileSystemComponent(ABC):
@@ -6,6 +7,44 @@ class FileSystemComponent(ABC):
         # Constructor to initialize the common name attribute for any file system component
         self.name = name
         self.indent = indent
+        # Back-pointer to the Directory that contains this component (None for a root)
+        self.parent = None
+
+    def _propagate_size(self, delta):
+        # Push a size change up through every ancestor so their cached totals stay correct.
+        # Costs O(depth) per change instead of O(n) per get_size() call.
+        if delta == 0:
+            return
+        node = self.parent
+        while node is not None:
+            node._size += delta
+            node = node.parent
+
+    def _invalidate(self):
+        # Drop the cached digests (see file_system_diff.py) and extension statistics
+        # (see file_system_query.py) of every directory above this component.
+        # Both are computed bottom-up, so once we reach an ancestor with neither we can stop
+        node = self.parent
+        while node is not None and (node._digest is not None or node._extensions is not None):
+            node._digest = None
+            node._extensions = None
+            node = node.parent
+
+    def _root(self):
+        node = self
+        while node.parent is not None:
+            node = node.parent
+        return node
+
+    @property
+    def path(self):
+        # "/"-separated path from the root directory, which itself is "/"
+        names = []
+        node = self
+        while node.parent is not None:
+            names.append(node.name)
+            node = node.parent
+        return "/" + "/".join(reversed(names))
 
     @abstractmethod
     def display(self):
@@ -24,7 +63,19 @@ class File(FileSystemComponent):
         # Initialize the base class with the name - required parameter, so we need to use it in super()...
         super().__init__(name, indent)
         # File size is specific to the File class
-        self.size = size
+        self._size = size
+
+    @property
+    def size(self):
+        return self._size
+
+    @size.setter
+    def size(self, value):
+        # Changing a file's size updates the cached totals of all its ancestors
+        delta = value - self._size
+        self._size = value
+        self._propagate_size(delta)
+        self._invalidate()
 
     def display(self, current_indent=None):
         # Print details about the file, including its name and size
@@ -33,86 +84,263 @@ class File(FileSystemComponent):
 
     def get_size(self):
         # Return the size of the file
-        return self.size
+        return self._size
 
 # Define the Directory class that represents a directory in the file system
 class Directory(FileSystemComponent):
     def __init__(self, name, indent=""):
         # Initialize the base class with the name
         super().__init__(name, indent)
-        # A directory has a list of children that can be files or other directories
-        self.children = []
+        # Children are kept in a dict keyed by name (in insertion order), so finding or
+        # removing a child is O(1) instead of a linear scan of a list
+        self._children = {}
+        # Cached total size of the whole subtree, maintained incrementally by add/remove
+        # and by File size changes, so get_size() is O(1)
+        self._size = 0
+        # Path -> component index over the whole tree. Only the root directory holds one,
+        # and only once lookup() has been used; add/remove keep it in sync after that
+        self._index = None
+        # Cached Merkle-style digest of the subtree, filled in by file_system_diff.py
+        # and cleared by any change below this directory
+        self._digest = None
+        # Cached {extension: [count, total bytes, largest file]} of the subtree, filled in by
+        # file_system_query.py and cleared together with the digest
+        self._extensions = None
 
-    def add(self, component):
-        # Add a file or directory to the directory's list of children
+    @property
+    def children(self):
+        # The files and directories in this directory, in the order they were added
+        return self._children.values()
+
+    def get_child(self, name):
+        # Return the direct child called `name`, or None
+        return self._children.get(name)
+
+    def _check_names(self, components):
+        # Raise ValueError if any of `components` would clash with a child or with another one of
+        # them, or is this directory or one of its ancestors (adding it would make the parent
+        # pointers loop). Called before anything is detached or attached, so a bad add leaves both
+        # trees intact
+        ancestors = set()
+        node = self
+        while node is not None:
+            ancestors.add(id(node))
+            node = node.parent
+        names = set()
+        for component in components:
+            if id(component) in ancestors:
+                raise ValueError(f"cannot add {component.name} to itself or to one of its descendants")
+            existing = self._children.get(component.name)
+            if (existing is not None and existing is not component) or component.name in names:
+                raise ValueError(f"{self.name} already contains {component.name}")
+            names.add(component.name)
+
+    def _attach(self, component):
+        # Link `component` under this directory without touching the cached sizes.
+        # The caller has checked the name with _check_names()
+        if component.parent is not None:
+            component.parent.remove(component)
         component.indent = self.indent + "-"
-        self.children.append(component)
+        component.parent = self
+        self._children[component.name] = component
+        component._invalidate()
+        if isinstance(component, Directory):
+            # It is no longer a root, so its own index (if any) is stale
+            component._index = None
+        root = self._root()
+        if root._index is not None:
+            root._index.update(_subtree_paths(component, component.path))
+
+    def add(self, component):
+        # Add a file or directory to the directory's children
+        # A component can only live in one directory, so adding it here moves it
+        self._check_names([component])
+        self._attach(component)
+        self._size += component.get_size()
+        self._propagate_size(component.get_size())
+
+    def add_many(self, components):
+        # Bulk version of add(): attach all components, then push the size change
+        # up the ancestors once instead of once per component
+        components = list(components)
+        self._check_names(components)
+        total = 0
+        for component in components:
+            self._attach(component)
+            total += component.get_size()
+        self._size += total
+        self._propagate_size(total)
 
     def remove(self, component):
-        # Remove a file or directory from the directory's list of children
-        self.children.remove(component)
+        # Remove a file or directory from the directory's children
+        if self._children.get(component.name) is not component:
+            raise ValueError(f"{component.name} is not in {self.name}")
+        root = self._root()
+        if root._index is not None:
+            for path, _ in _subtree_paths(component, component.path):
+                del root._index[path]
+        component._invalidate()
+        del self._children[component.name]
+        component.parent = None
+        self._size -= component.get_size()
+        self._propagate_size(-component.get_size())
+
+    def lookup(self, path):
+        # Return the component at `path` (relative to this directory, e.g. "/a/b/c.txt"), or None.
+        # The first lookup builds the tree's path index in O(n); after that each lookup is a dict access
+        root = self._root()
+        if root._index is None:
+            root._index = dict(_subtree_paths(root, "/"))
+        if self is not root:
+            path = self.path + path if path != "/" else self.path
+        return root._index.get(path)
+
+    def remove_paths(self, paths):
+        # Remove every component named in `paths` (relative to this directory).
+        # All paths are resolved before anything is removed, so a missing path leaves the tree untouched
+        resolved = []
+        for path in paths:
+            component = self.lookup(path)
+            if component is None:
+                raise KeyError(path)
+            if component.parent is None:
+                raise ValueError("cannot remove the root directory")
+            resolved.append((component.path, component))
+        index = self._root()._index
+        for path, component in resolved:
+            # Skip components that went away with an ancestor removed earlier in the batch
+            if index.get(path) is component:
+                component.parent.remove(component)
 
     def display(self, current_indent=None):
         # Display information about the directory itself
         indent = current_indent if current_indent is not None else self.indent
-        print(f"{indent} Directory: {self.name}")        
-        print(f"{self.indent} Directory: {self.name}")
-        # Recursively display information about each child in the directory
-        for child in self.children:
-            child.display(indent+"-")
+        # Walk the subtree iteratively so deep trees cannot hit the recursion limit
+        for depth, node in walk_preorder(self):
+            if isinstance(node, Directory):
+                print(f"{indent + '-' * depth} Directory: {node.name}")
+            else:
+                node.display(indent + "-" * depth)
 
     def get_size(self):
-        # Calculate the total size of the directory by summing the sizes of its contents
-        # recursive call as if child is not a leaf, we will get into same get_size function
-        total_size = 0
-        for child in self.children:
-            total_size += child.get_size()
-        return total_size
+        # Return the cached total size of the directory's contents.
+        # The cache is kept up to date on every add/remove/resize, so there is no recursive walk here
+        return self._size
 
     def list_files(self):
         # List all the files contained in this Directory instance
-        files = []
-        for child in self.children:
-            if isinstance(child, File):
-                files.append(child.name) # Add the name of the file
-            elif isinstance(child, Directory):
-                files.extend(child.list_files())
-        return files
+        return list(self.iter_files())
 
-# Usage
-file1 = File("file1.txt", 1200)  # size in bytes
-file2 = File("file2.txt", 1500)  # size in bytes
-file3 = File("file3.txt", 1000)  # size in bytes
-dir1 = Directory("dir1")
-dir2 = Directory("dir2")
+    def iter_files(self):
+        # Stream the names of all files in this Directory instance, in the same order as list_files()
+        for _, node in walk_preorder(self, predicate=_is_file):
+            yield node.name
+
+# Streaming traversals over any FileSystemComponent.
+# Each walker yields (depth, component) pairs, the starting component being at depth 0.
+# max_depth stops the descent below that depth; predicate decides which components are yielded
+# (directories that fail the predicate are still descended into).
+# Pre-order and post-order keep one iterator per open directory, so the extra memory is O(depth),
+# not O(n). Breadth-first keeps a queue, so it is O(width of the widest level).
+# Do not add or remove children of a directory while it is being walked.
+
+def _is_file(component):
+    return isinstance(component, File)
 
-# parent is dir1. in dir1 we have file1,file2 and dir2. in dir2 we have file3.
-dir1.add(file1)
-dir1.add(file2)
-dir2.add(file3)
-dir1.add(dir2)
+def _subtree_paths(component, path):
+    # (path, component) for `component` (whose path is `path`) and everything below it
+    yield path, component
+    prefixes = [path.rstrip("/")]  # prefixes[depth] = path of the open directory at that depth
+    walker = walk_preorder(component)
+    next(walker)
+    for depth, node in walker:
+        del prefixes[depth:]
+        node_path = prefixes[depth - 1] + "/" + node.name
+        prefixes.append(node_path)
+        yield node_path, node
+
+def walk_preorder(component, max_depth=None, predicate=None):
+    # Parents are yielded before their children
+    if predicate is None or predicate(component):
+        yield 0, component
+    if not isinstance(component, Directory) or max_depth == 0:
+        return
+    stack = [iter(component.children)]
+    while stack:
+        child = next(stack[-1], None)
+        if child is None:
+            stack.pop()
+            continue
+        depth = len(stack)
+        if predicate is None or predicate(child):
+            yield depth, child
+        if isinstance(child, Directory) and (max_depth is None or depth < max_depth):
+            stack.append(iter(child.children))
+
+def walk_postorder(component, max_depth=None, predicate=None):
+    # Children are yielded before their parents (e.g. to delete or aggregate bottom-up)
+    if isinstance(component, Directory) and max_depth != 0:
+        stack = [(component, iter(component.children))]
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                if predicate is None or predicate(node):
+                    yield len(stack), node
+                continue
+            depth = len(stack)
+            if isinstance(child, Directory) and (max_depth is None or depth < max_depth):
+                stack.append((child, iter(child.children)))
+            elif predicate is None or predicate(child):
+                yield depth, child
+    elif predicate is None or predicate(component):
+        yield 0, component
+
+def walk_bfs(component, max_depth=None, predicate=None):
+    # Level by level: everything at depth 1, then depth 2, ...
+    pending = deque([(0, component)])
+    while pending:
+        depth, node = pending.popleft()
+        if predicate is None or predicate(node):
+            yield depth, node
+        if isinstance(node, Directory) and (max_depth is None or depth < max_depth):
+            pending.extend((depth + 1, child) for child in node.children)
+
+# Usage
+if __name__ == "__main__":
+    file1 = File("file1.txt", 1200)  # size in bytes
+    file2 = File("file2.txt", 1500)  # size in bytes
+    file3 = File("file3.txt", 1000)  # size in bytes
+    dir1 = Directory("dir1")
+    dir2 = Directory("dir2")
 
-print("Before removal:")
-dir1.display()
+    # parent is dir1. in dir1 we have file1,file2 and dir2. in dir2 we have file3.
+    dir1.add(file1)
+    dir1.add(file2)
+    dir2.add(file3)
+    dir1.add(dir2)
 
-# Display total size of dir1
-print(f"Total size of {dir1.name} before removal: {dir1.get_size()} bytes")
+    print("Before removal:")
+    dir1.display()
 
-# List all files in dir1
-print("\nListing all files in dir1:")
-print(dir1.list_files())
+    # Display total size of dir1
+    print(f"Total size of {dir1.name} before removal: {dir1.get_size()} bytes")
 
-# Remove file2 and dir2
-dir1.remove(file2)
-dir1.remove(dir2)
+    # List all files in dir1
+    print("\nListing all files in dir1:")
+    print(dir1.list_files())
 
-print("\nAfter removal:")
-dir1.display()
+    # Remove file2 and dir2
+    dir1.remove(file2)
+    dir1.remove(dir2)
 
-# List all files in dir1
-print("\nListing all files in dir1:")
-print(dir1.list_files())
+    print("\nAfter removal:")
+    dir1.display()
 
-# Display total size of dir1
-print(f"Total size of {dir1.name}: {dir1.get_size()} bytes")
+    # List all files in dir1
+    print("\nListing all files in dir1:")
+    print(dir1.list_files())
 
+    # Display total size of dir1
+    print(f"Total size of {dir1.name}: {dir1.get_size()} bytes")
@@ -0,0 +1,111 @@
+from hashlib import blake2b
+
+from file_system_component import File, Directory, _subtree_paths
+
+# Diff two File/Directory trees (e.g. yesterday's and today's scan) into added, removed and
+# resized files.
+# Every directory gets a Merkle-style digest: a hash of its name and of the digests of its
+# children, where a file's digest hashes its name and size. Two subtrees with the same digest
+# are identical, so the diff skips them after a single comparison and only descends into
+# directories whose digests differ. Digests are cached on the Directory and cleared by
+# add/remove/resize (see FileSystemComponent._invalidate), so after the first diff, the work
+# is proportional to what changed rather than to the size of the trees.
+
+ADDED = "added"
+REMOVED = "removed"
+RESIZED = "resized"
+
+class Change:
+    def __init__(self, kind, path, old_size, new_size):
+        self.kind = kind
+        self.path = path
+        self.old_size = old_size
+        self.new_size = new_size
+
+    def __eq__(self, other):
+        return (isinstance(other, Change) and
+                (self.kind, self.path, self.old_size, self.new_size) ==
+                (other.kind, other.path, other.old_size, other.new_size))
+
+    def __repr__(self):
+        return f"Change({self.kind!r}, {self.path!r}, {self.old_size}, {self.new_size})"
+
+def _file_digest(file):
+    return blake2b(f"F{file.name}\0{file.size}".encode(), digest_size=16).digest()
+
+def digest(component):
+    # Digest of `component`'s subtree, computing (and caching) it for any directory that lacks one
+    if isinstance(component, File):
+        return _file_digest(component)
+    if component._digest is not None:
+        return component._digest
+    # Iterative post-order over the directories that still need a digest
+    stack = [(component, False)]
+    while stack:
+        directory, children_done = stack.pop()
+        if children_done:
+            h = blake2b(f"D{directory.name}\0".encode(), digest_size=16)
+            # Children are hashed in name order so insertion order does not matter
+            for child in sorted(directory.children, key=lambda c: c.name):
+                h.update(child._digest if isinstance(child, Directory) else _file_digest(child))
+            directory._digest = h.digest()
+            continue
+        stack.append((directory, True))
+        for child in directory.children:
+            if isinstance(child, Directory) and child._digest is None:
+                stack.append((child, False))
+    return component._digest
+
+def _files(component, path, kind):
+    # One ADDED or REMOVED change for each file in `component`'s subtree
+    for node_path, node in _subtree_paths(component, path):
+        if isinstance(node, File):
+            if kind == ADDED:
+                yield Change(ADDED, node_path, None, node.size)
+            else:
+                yield Change(REMOVED, node_path, node.size, None)
+
+def diff_trees(old, new):
+    # Yield a Change for every file that was added, removed or resized between two directories.
+    # Paths are relative to the two roots, e.g. "/dir2/file3.txt"
+    if digest(old) == digest(new):
+        return
+    stack = [(old, new, "")]
+    while stack:
+        old_dir, new_dir, path = stack.pop()
+        for old_child in old_dir.children:
+            child_path = path + "/" + old_child.name
+            new_child = new_dir.get_child(old_child.name)
+            if new_child is None:
+                yield from _files(old_child, child_path, REMOVED)
+            elif isinstance(old_child, Directory) and isinstance(new_child, Directory):
+                if digest(old_child) != digest(new_child):
+                    stack.append((old_child, new_child, child_path))
+            elif isinstance(old_child, File) and isinstance(new_child, File):
+                if old_child.size != new_child.size:
+                    yield Change(RESIZED, child_path, old_child.size, new_child.size)
+            else:
+                # A file became a directory or the other way round
+                yield from _files(old_child, child_path, REMOVED)
+                yield from _files(new_child, child_path, ADDED)
+        for new_child in new_dir.children:
+            if old_dir.get_child(new_child.name) is None:
+                yield from _files(new_child, path + "/" + new_child.name, ADDED)
+
+if __name__ == "__main__":
+    yesterday = Directory("dir1")
+    yesterday.add(File("file1.txt", 1200))
+    yesterday.add(File("file2.txt", 1500))
+    dir2 = Directory("dir2")
+    dir2.add(File("file3.txt", 1000))
+    yesterday.add(dir2)
+
+    today = Directory("dir1")
+    today.add(File("file1.txt", 1300))
+    dir2 = Directory("dir2")
+    dir2.add(File("file3.txt", 1000))
+    dir2.add(File("file4.txt", 500))
+    today.add(dir2)
+
+    for change in diff_trees(yesterday, today):
+        print(change)
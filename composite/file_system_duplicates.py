@@ -0,0 +1,86 @@
+import mmap
+import os
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import blake2b
+
+from file_system_component import File, _subtree_paths
+
+# Find duplicate files in a File/Directory tree built from disk (see file_system_scanner.py).
+# Content is only read when it has to be:
+#   1. group files by size - already known from the tree, no I/O at all
+#   2. for sizes shared by 2+ files, hash the first block of each file
+#   3. for files whose first blocks still collide, hash the full content
+# Hashing runs on a process pool so it is not limited by the GIL; each worker reads the file
+# through mmap in fixed-size chunks, so memory use stays flat whatever the file size.
+
+PARTIAL_BYTES = 64 * 1024
+CHUNK_BYTES = 4 * 1024 * 1024
+
+def _hash_file(args):
+    # Runs in a worker process: hash the first `limit` bytes of a file (None = whole file).
+    # Returns (path, digest), digest being None if the file could not be read
+    path, limit = args
+    h = blake2b(digest_size=32)
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            end = size if limit is None else min(size, limit)
+            if end:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    for start in range(0, end, CHUNK_BYTES):
+                        h.update(mm[start:min(start + CHUNK_BYTES, end)])
+    except (OSError, ValueError):
+        return path, None
+    return path, h.digest()
+
+def _group_by_hash(pool, groups, limit):
+    # Hash every path in `groups` and split each group by digest, keeping only real collisions
+    jobs = [(path, limit) for group in groups for path in group]
+    group_of = {path: g for g, group in enumerate(groups) for path in group}
+    by_digest = defaultdict(list)
+    for path, digest in pool.map(_hash_file, jobs, chunksize=max(1, len(jobs) // 256)):
+        if digest is not None:
+            # Keep files from different input groups apart even if their digests match
+            by_digest[group_of[path], digest].append(path)
+    return [group for group in by_digest.values() if len(group) > 1]
+
+def find_duplicates(root, base_path=None, workers=None, min_size=1, partial_bytes=PARTIAL_BYTES):
+    # Return a list of groups of identical files, each group a list of paths on disk.
+    # `base_path` is the directory `root` was scanned from; the scanner stores it as root.fs_path
+    if base_path is None:
+        base_path = root.fs_path
+
+    # Stage 1: same size is necessary for same content
+    by_size = defaultdict(list)
+    for path, node in _subtree_paths(root, ""):
+        if isinstance(node, File) and node.size >= min_size:
+            by_size[node.size].append(base_path + path)
+    small_groups = [group for size, group in by_size.items() if len(group) > 1 and size <= partial_bytes]
+    large_groups = [group for size, group in by_size.items() if len(group) > 1 and size > partial_bytes]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Stage 2: the first block; for small files this already is the whole content
+        duplicates = _group_by_hash(pool, small_groups, None)
+        candidates = _group_by_hash(pool, large_groups, partial_bytes)
+        # Stage 3: full content for files whose sizes and first blocks both match
+        duplicates += _group_by_hash(pool, candidates, None)
+    return duplicates
+
+if __name__ == "__main__":
+    from file_system_scanner import FileSystemScanner
+
+    # Usage: python file_system_duplicates.py [path] [workers]
+    target = sys.argv[1] if len(sys.argv) > 1 else "."
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    tree = FileSystemScanner().scan(target)
+    groups = find_duplicates(tree, workers=workers)
+    wasted = 0
+    for group in groups:
+        size = os.path.getsize(group[0])
+        wasted += size * (len(group) - 1)
+        print(f"{size:,} bytes x {len(group)}:")
+        for path in group:
+            print(f"    {path}")
+    print(f"{len(groups)} groups of duplicates, {wasted:,} bytes reclaimable")
@@ -0,0 +1,134 @@
+import os
+import re
+from fnmatch import translate
+from functools import lru_cache
+
+from file_system_component import File, Directory
+
+# Queries over a File/Directory tree, e.g. "all *.log files over 1 GB under /var" or
+# "total size grouped by extension".
+# Every directory caches a histogram of its subtree: {extension: [count, total bytes, largest file]}.
+# It is computed bottom-up on first use and cleared along the ancestor chain by add/remove/resize
+# (see FileSystemComponent._invalidate), so repeated queries do not re-walk the tree:
+#   - size_by_extension() reads the histogram of one directory
+#   - find() skips every subtree whose histogram shows it cannot contain a match
+#     (no file with an extension the pattern allows, or no file big enough)
+
+WILDCARDS = re.compile(r"[*?\[\]]")
+
+def extension_of(name):
+    # ".log" for "server.log", "" for "Makefile"; case-insensitive
+    return os.path.splitext(name)[1].lower()
+
+@lru_cache(maxsize=256)
+def compile_glob(pattern):
+    # Return (match function for file names, the extensions a match can have or None if any)
+    match = re.compile(translate(pattern)).match
+    parts = WILDCARDS.split(pattern)
+    suffix = parts[-1]
+    if len(parts) == 1:
+        # No wildcards: the pattern is the whole name, e.g. ".gitignore" (no extension)
+        extensions = (extension_of(pattern),)
+    elif "." in suffix:
+        # The literal text after the last wildcard ends every match, so a match's last dot is the
+        # suffix's last dot: "app-*.tar.gz" can only match names ending in ".gz". Unless only dots
+        # can come before it - "*" may match nothing, and extension_of (os.path.splitext) gives
+        # ".log" or "..log" no extension - so "*.log" matches names with ".log" or none at all
+        last_dot = suffix.rindex(".")
+        extensions = (suffix[last_dot:].lower(),)
+        if not suffix[:last_dot].strip("."):
+            extensions += ("",)
+    else:
+        extensions = None
+    return match, extensions
+
+def extension_stats(directory):
+    # The cached histogram of `directory`'s subtree, computing it for any directory that lacks one
+    if directory._extensions is not None:
+        return directory._extensions
+    # Iterative post-order over the directories that still need a histogram
+    stack = [(directory, False)]
+    while stack:
+        node, children_done = stack.pop()
+        if children_done:
+            histogram = {}
+            for child in node.children:
+                if isinstance(child, File):
+                    entry = histogram.setdefault(extension_of(child.name), [0, 0, 0])
+                    entry[0] += 1
+                    entry[1] += child.size
+                    entry[2] = max(entry[2], child.size)
+                else:
+                    for extension, (count, total, largest) in child._extensions.items():
+                        entry = histogram.setdefault(extension, [0, 0, 0])
+                        entry[0] += count
+                        entry[1] += total
+                        entry[2] = max(entry[2], largest)
+            node._extensions = histogram
+            continue
+        stack.append((node, True))
+        for child in node.children:
+            if isinstance(child, Directory) and child._extensions is None:
+                stack.append((child, False))
+    return directory._extensions
+
+def size_by_extension(root, under="/"):
+    # {extension: (file count, total bytes)} for the subtree at `under`, biggest first
+    start = _resolve(root, under)
+    histogram = extension_stats(start)
+    return {extension: (count, total)
+            for extension, (count, total, _) in sorted(histogram.items(), key=lambda item: -item[1][1])}
+
+def _resolve(root, under):
+    start = root.lookup(under)
+    if not isinstance(start, Directory):
+        raise KeyError(under)
+    return start
+
+def _could_match(directory, extensions, min_size):
+    # False if the cached histogram proves nothing below `directory` can match
+    histogram = extension_stats(directory)
+    if extensions is not None:
+        return any(extension in histogram and (min_size is None or histogram[extension][2] >= min_size)
+                   for extension in extensions)
+    if min_size is not None:
+        return any(largest >= min_size for _, _, largest in histogram.values())
+    return True
+
+def find(root, pattern=None, min_size=None, max_size=None, under="/"):
+    # Yield (path, File) for every file below `under` whose name matches the glob `pattern`
+    # and whose size is within [min_size, max_size]
+    match, extensions = compile_glob(pattern) if pattern is not None else (None, None)
+    start = _resolve(root, under)
+    if not _could_match(start, extensions, min_size):
+        return
+    stack = [(start, under.rstrip("/"))]
+    while stack:
+        directory, path = stack.pop()
+        for child in directory.children:
+            if isinstance(child, Directory):
+                if _could_match(child, extensions, min_size):
+                    stack.append((child, path + "/" + child.name))
+            elif ((min_size is None or child.size >= min_size) and
+                  (max_size is None or child.size <= max_size) and
+                  (match is None or match(child.name))):
+                yield path + "/" + child.name, child
+
+if __name__ == "__main__":
+    logs = Directory("logs")
+    logs.add(File("app.log", 5_000))
+    logs.add(File("app.log.1", 2_000_000))
+    logs.add(File("error.log", 3_000_000))
+    src = Directory("src")
+    src.add(File("main.py", 1_200))
+    src.add(File("util.py", 800))
+    root = Directory("root")
+    root.add(logs)
+    root.add(src)
+    root.add(File("README.md", 300))
+
+    print("*.log over 1 MB:")
+    for path, file in find(root, "*.log", min_size=1_000_000):
+        print(f"    {path}: {file.size} bytes")
+    print("Size by extension:", size_by_extension(root))
+    print("Under /src:", size_by_extension(root, "/src"))
@@ -0,0 +1,82 @@
+import sys
+from json.encoder import encode_basestring
+
+from file_system_component import Directory, walk_preorder
+
+# Fast output of a File/Directory tree to any text stream.
+# Directory.display() calls print() once per node; here lines are collected and written to the
+# stream in large blocks, indent prefixes are built once per depth instead of once per node,
+# and directory sizes come from the cached totals, so a du-style report costs no extra walk.
+# Formats:
+#   "text"  - the same lines as display()
+#   "jsonl" - one JSON object per node: {"path", "type", "size", "depth"}
+#   "du"    - "<size>\t<path>" for every directory, children before parents, like `du -b`
+
+BUFFER_CHARS = 1 << 20
+
+def _text_lines(component, max_depth):
+    prefixes = [""]
+    for depth, node in walk_preorder(component, max_depth=max_depth):
+        while len(prefixes) <= depth:
+            prefixes.append(prefixes[-1] + "-")
+        if isinstance(node, Directory):
+            yield f"{prefixes[depth]} Directory: {node.name}\n"
+        else:
+            yield f"{prefixes[depth]} File: {node.name}, Size: {node.size} bytes\n"
+
+def _json_lines(component, max_depth):
+    paths = [""]  # paths[depth] = path of the open directory at that depth
+    for depth, node in walk_preorder(component, max_depth=max_depth):
+        del paths[depth:]
+        path = paths[depth - 1] + "/" + node.name if depth else "/"
+        paths.append(path if depth else "")
+        kind = "directory" if isinstance(node, Directory) else "file"
+        # Only the path needs JSON escaping; building the rest by hand is much faster than json.dumps
+        yield f'{{"path": {encode_basestring(path)}, "type": "{kind}", "size": {node.get_size()}, "depth": {depth}}}\n'
+
+def _du_lines(component, max_depth):
+    if not isinstance(component, Directory):
+        yield f"{component.get_size()}\t/{component.name}\n"
+        return
+    # Post-order over directories only, keeping the path of each open directory on the stack
+    stack = [(component, iter(component.children), "")]
+    while stack:
+        directory, children, path = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            yield f"{directory.get_size()}\t{path or '/'}\n"
+        elif isinstance(child, Directory) and (max_depth is None or len(stack) <= max_depth):
+            stack.append((child, iter(child.children), path + "/" + child.name))
+
+FORMATS = {
+    "text": _text_lines,
+    "jsonl": _json_lines,
+    "du": _du_lines,
+}
+
+def render(component, stream=None, fmt="text", max_depth=None, buffer_chars=BUFFER_CHARS):
+    # Write `component`'s tree to `stream` (stdout by default) in the given format
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown format {fmt!r}, expected one of {', '.join(FORMATS)}")
+    stream = sys.stdout if stream is None else stream
+    chunk = []
+    pending = 0
+    for line in FORMATS[fmt](component, max_depth):
+        chunk.append(line)
+        pending += len(line)
+        if pending >= buffer_chars:
+            stream.write("".join(chunk))
+            chunk.clear()
+            pending = 0
+    stream.write("".join(chunk))
+    stream.flush()
+
+if __name__ == "__main__":
+    from file_system_scanner import FileSystemScanner
+
+    # Usage: python file_system_renderer.py [path] [text|jsonl|du] [max_depth]
+    target = sys.argv[1] if len(sys.argv) > 1 else "."
+    fmt = sys.argv[2] if len(sys.argv) > 2 else "text"
+    depth = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    render(FileSystemScanner().scan(target), fmt=fmt, max_depth=depth)
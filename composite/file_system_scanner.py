@@ -0,0 +1,230 @@
+import os
+import queue
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from file_system_component import File, Directory, _subtree_paths
+
+# Builds a File/Directory composite from a real directory tree.
+# Every directory is listed with os.scandir on a thread pool (scandir releases the GIL while it
+# waits on the file system, so slow/network volumes get listed in parallel), while the main thread
+# assembles the composite in bulk with Directory.add_many().
+
+class ScanStats:
+    def __init__(self):
+        self.files = 0
+        self.directories = 0
+        self.skipped = 0  # directories already visited (symlink loops, bind mounts)
+        self.errors = 0   # entries we could not list or stat (permissions, dangling links)
+        self.elapsed = 0.0
+
+    @property
+    def entries(self):
+        return self.files + self.directories
+
+    @property
+    def entries_per_second(self):
+        return self.entries / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return (f"{self.entries:,} entries ({self.files:,} files, {self.directories:,} directories) "
+                f"in {self.elapsed:.2f}s = {self.entries_per_second:,.0f} entries/s, "
+                f"{self.skipped} skipped, {self.errors} errors")
+
+class RefreshStats(ScanStats):
+    # For a refresh, `files` and `directories` count the entries that were added
+    def __init__(self):
+        super().__init__()
+        self.checked = 0    # directories whose mtime was compared
+        self.rescanned = 0  # directories listed again because they changed
+        self.removed = 0
+        self.resized = 0
+
+    def __str__(self):
+        return (f"checked {self.checked:,} directories, rescanned {self.rescanned:,}: "
+                f"{self.files:,} files and {self.directories:,} directories added, "
+                f"{self.removed:,} removed, {self.resized:,} resized in {self.elapsed:.2f}s, "
+                f"{self.skipped} skipped, {self.errors} errors")
+
+class FileSystemScanner:
+    def __init__(self, workers=8, follow_symlinks=False):
+        self.workers = workers
+        # When False, symlinks are recorded as files with the size of the link itself (like `du -P`)
+        self.follow_symlinks = follow_symlinks
+        self.stats = ScanStats()
+
+    def scan(self, path):
+        # Walk `path` and return the root Directory of the composite built from it
+        self.stats = ScanStats()
+        start = time.perf_counter()
+        path = os.path.abspath(path)
+        root = Directory(os.path.basename(path) or path)
+        root.fs_path = path
+
+        # Directories are identified by (device, inode) so that following a symlink
+        # back into an ancestor cannot make us walk the same directory forever
+        st = os.stat(path)
+        root.mtime_ns = st.st_mtime_ns
+        visited = {(st.st_dev, st.st_ino)}
+        self.stats.directories += 1
+        self._fill([(root, path)], visited, self.stats)
+
+        self.stats.elapsed = time.perf_counter() - start
+        return root
+
+    def refresh(self, root, check_files=False):
+        # Bring a tree returned by scan() up to date with the disk, patching it in place.
+        # A directory's mtime changes when entries are added, removed or renamed in it, so only
+        # directories whose mtime differs from the one recorded at scan time are listed again.
+        # That costs one stat per directory plus work proportional to the changed directories.
+        # Editing a file in place does not touch its directory's mtime; pass check_files=True to
+        # re-list every directory and pick up such size changes too.
+        stats = RefreshStats()
+        start = time.perf_counter()
+        directories = [(node, root.fs_path + path) for path, node in _subtree_paths(root, "")
+                       if isinstance(node, Directory)]
+        visited = set()
+        changed = []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for (directory, dir_path), state in zip(directories, pool.map(self._stat_directory,
+                                                                          [p for _, p in directories])):
+                if state is None:
+                    continue  # gone: the listing of its parent will drop it
+                key, mtime_ns = state
+                visited.add(key)
+                if check_files or mtime_ns != directory.mtime_ns:
+                    directory.mtime_ns = mtime_ns
+                    changed.append((directory, dir_path))
+            stats.checked = len(directories)
+
+            new_dirs = []
+            listings = pool.map(self._list_directory, [p for _, p in changed])
+            for (directory, dir_path), (entries, errors) in zip(changed, listings):
+                # Directories are patched parents first; skip any that a parent's patch just removed
+                if directory._root() is not root:
+                    continue
+                stats.errors += errors
+                stats.rescanned += 1
+                self._patch(directory, dir_path, entries, visited, new_dirs, stats)
+        # Directories that appeared since the last scan are walked like in scan()
+        self._fill(new_dirs, visited, stats)
+
+        stats.elapsed = time.perf_counter() - start
+        self.stats = stats
+        return stats
+
+    def _fill(self, pending, visited, stats):
+        # List every (directory, path) in `pending` and everything below it, adding the children
+        # to the composite. Workers put finished listings on a queue; only this thread touches the tree
+        results = queue.Queue()
+        outstanding = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            def submit(directory, dir_path):
+                future = pool.submit(self._list_directory, dir_path)
+                # Pass the future itself: calling result() here would swallow an exception
+                # raised by the worker, and the loop below would wait for it forever
+                future.add_done_callback(lambda f: results.put((directory, dir_path, f)))
+
+            for directory, dir_path in pending:
+                submit(directory, dir_path)
+                outstanding += 1
+            while outstanding:
+                directory, dir_path, future = results.get()
+                outstanding -= 1
+                entries, errors = future.result()  # re-raises anything the worker raised
+                stats.errors += errors
+                children = []
+                for name, is_dir, size, key, mtime_ns in entries:
+                    if is_dir:
+                        if key in visited:
+                            stats.skipped += 1
+                            continue
+                        visited.add(key)
+                        sub = Directory(name)
+                        sub.mtime_ns = mtime_ns
+                        children.append(sub)
+                        stats.directories += 1
+                        submit(sub, os.path.join(dir_path, name))
+                        outstanding += 1
+                    else:
+                        children.append(File(name, size))
+                        stats.files += 1
+                directory.add_many(children)
+
+    def _patch(self, directory, dir_path, entries, visited, new_dirs, stats):
+        # Make `directory`'s children match a fresh listing. New sub-directories are queued on
+        # `new_dirs` to be walked afterwards; existing ones are left to their own mtime check
+        seen = set()
+        added = []
+        for name, is_dir, size, key, mtime_ns in entries:
+            seen.add(name)
+            child = directory.get_child(name)
+            if child is not None and isinstance(child, Directory) != is_dir:
+                # A file was replaced by a directory or the other way round
+                directory.remove(child)
+                stats.removed += 1
+                child = None
+            if child is None:
+                if is_dir:
+                    if key in visited:
+                        stats.skipped += 1
+                        continue
+                    visited.add(key)
+                    sub = Directory(name)
+                    sub.mtime_ns = mtime_ns
+                    added.append(sub)
+                    new_dirs.append((sub, os.path.join(dir_path, name)))
+                    stats.directories += 1
+                else:
+                    added.append(File(name, size))
+                    stats.files += 1
+            elif not is_dir and child.size != size:
+                # The size setter keeps the cached directory totals correct
+                child.size = size
+                stats.resized += 1
+        for child in [child for child in directory.children if child.name not in seen]:
+            directory.remove(child)
+            stats.removed += 1
+        directory.add_many(added)
+
+    def _stat_directory(self, dir_path):
+        # Runs on a worker thread: ((dev, inode), mtime_ns) of a directory, or None if it is gone
+        try:
+            st = os.stat(dir_path)
+        except OSError:
+            return None
+        return (st.st_dev, st.st_ino), st.st_mtime_ns
+
+    def _list_directory(self, dir_path):
+        # Runs on a worker thread: list one directory and stat its entries.
+        # Returns ([(name, is_dir, size, (dev, inode), mtime_ns), ...], error_count)
+        entries = []
+        errors = 0
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=self.follow_symlinks)
+                        st = entry.stat(follow_symlinks=self.follow_symlinks)
+                        if is_dir and st.st_ino == 0:
+                            # DirEntry.stat() leaves st_dev/st_ino at 0 on Windows; the loop
+                            # protection needs the real ones
+                            st = os.stat(entry.path, follow_symlinks=self.follow_symlinks)
+                    except OSError:
+                        errors += 1
+                        continue
+                    entries.append((entry.name, is_dir, 0 if is_dir else st.st_size,
+                                    (st.st_dev, st.st_ino), st.st_mtime_ns))
+        except OSError:
+            errors += 1
+        return entries, errors
+
+if __name__ == "__main__":
+    # Usage: python file_system_scanner.py [path] [workers]
+    target = sys.argv[1] if len(sys.argv) > 1 else "."
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    scanner = FileSystemScanner(workers=workers)
+    tree = scanner.scan(target)
+    print(f"Total size of {tree.name}: {tree.get_size():,} bytes")
+    print(scanner.stats)
@@ -0,0 +1,202 @@
+import mmap
+import struct
+from array import array
+
+from file_system_component import Directory, walk_preorder
+
+# Binary snapshot of a File/Directory tree that is read back through mmap.
+# Opening a snapshot only maps the file and parses the header; nodes are decoded on demand,
+# so queries start answering immediately no matter how many entries the snapshot holds.
+#
+# Layout (little endian):
+#   header   magic "FSSNAP01", version u32, record size u32, node count u64,
+#            names offset u64, names length u64
+#   records  one fixed-size record per node, in pre-order:
+#            kind u8, 3 pad bytes, name length u32, name offset u64, parent i64,
+#            size u64 (cached subtree size for directories), end u64
+#   names    UTF-8 name bytes; identical names are stored once
+# Because records are in pre-order, the subtree of record i is exactly the records i+1 .. end-1,
+# and the next sibling of record i starts at its `end`.
+
+MAGIC = b"FSSNAP01"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQQQ")
+RECORD = struct.Struct("<B3xIQqQQ")
+
+FILE = 0
+DIRECTORY = 1
+
+def write_snapshot(component, path):
+    # Serialize the tree rooted at `component` to `path`; returns the number of nodes written
+    names = {}
+    name_blob = bytearray()
+    ends = array("q")
+    open_dirs = []  # (depth, index) of directories whose subtree is not finished yet
+    parents = []    # parents[depth] = index of the open directory at that depth
+    count = 0
+    with open(path, "wb") as f:
+        f.write(b"\0" * HEADER.size)
+        for depth, node in walk_preorder(component):
+            # Every open directory at this depth or deeper ends right before this node
+            while open_dirs and open_dirs[-1][0] >= depth:
+                ends[open_dirs.pop()[1]] = count
+            encoded = node.name.encode("utf-8")
+            offset = names.get(encoded)
+            if offset is None:
+                offset = len(name_blob)
+                names[encoded] = offset
+                name_blob += encoded
+            kind = DIRECTORY if isinstance(node, Directory) else FILE
+            parent = parents[depth - 1] if depth else -1
+            f.write(RECORD.pack(kind, len(encoded), offset, parent, node.get_size(), count + 1))
+            ends.append(count + 1)
+            if kind == DIRECTORY:
+                open_dirs.append((depth, count))
+                del parents[depth:]
+                parents.append(count)
+            count += 1
+        for _, index in open_dirs:
+            ends[index] = count
+        names_offset = HEADER.size + count * RECORD.size
+        f.write(name_blob)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, count, names_offset, len(name_blob)))
+
+    # Patch the directory `end` fields in place now that every subtree is known
+    with open(path, "r+b") as f, mmap.mmap(f.fileno(), 0) as mm:
+        end_field = RECORD.size - 8
+        for index, end in enumerate(ends):
+            if end != index + 1:
+                struct.pack_into("<Q", mm, HEADER.size + index * RECORD.size + end_field, end)
+    return count
+
+class Snapshot:
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size, count, names_offset, _ = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is not a file system snapshot")
+        self.count = count
+        self._names_offset = names_offset
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def root(self):
+        return SnapshotNode(self, 0)
+
+    def record(self, index):
+        # (kind, name, parent, size, end) of one node
+        kind, name_len, name_offset, parent, size, end = RECORD.unpack_from(
+            self._mm, HEADER.size + index * RECORD.size)
+        start = self._names_offset + name_offset
+        return kind, self._mm[start:start + name_len].decode("utf-8"), parent, size, end
+
+    def walk(self, index=0):
+        # Pre-order (depth, index) pairs for the subtree of `index`; it is a contiguous record range
+        end = self.record(index)[4]
+        ends = []  # end of each open directory, used to track the depth
+        for i in range(index, end):
+            while ends and ends[-1] <= i:
+                ends.pop()
+            yield len(ends), i
+            node_end = self.record(i)[4]
+            if node_end != i + 1:
+                ends.append(node_end)
+
+class SnapshotNode:
+    # Read-only view of one record; the same display/get_size/list_files API as File/Directory,
+    # plus name/parent/path/children. Snapshots cannot be changed, so it is not a FileSystemComponent
+    def __init__(self, snapshot, index):
+        self.snapshot = snapshot
+        self.index = index
+
+    @property
+    def name(self):
+        return self.snapshot.record(self.index)[1]
+
+    @property
+    def is_directory(self):
+        return self.snapshot.record(self.index)[0] == DIRECTORY
+
+    @property
+    def parent(self):
+        parent = self.snapshot.record(self.index)[2]
+        return SnapshotNode(self.snapshot, parent) if parent >= 0 else None
+
+    @property
+    def path(self):
+        # "/"-separated path from the root, which itself is "/", as for File/Directory
+        names = []
+        _, name, parent, _, _ = self.snapshot.record(self.index)
+        while parent >= 0:
+            names.append(name)
+            _, name, parent, _, _ = self.snapshot.record(parent)
+        return "/" + "/".join(reversed(names))
+
+    @property
+    def children(self):
+        children = []
+        child = self.index + 1
+        end = self.snapshot.record(self.index)[4]
+        while child < end:
+            children.append(SnapshotNode(self.snapshot, child))
+            child = self.snapshot.record(child)[4]
+        return children
+
+    def display(self, current_indent=""):
+        for depth, index in self.snapshot.walk(self.index):
+            kind, name, _, size, _ = self.snapshot.record(index)
+            indent = current_indent + "-" * depth
+            if kind == DIRECTORY:
+                print(f"{indent} Directory: {name}")
+            else:
+                print(f"{indent} File: {name}, Size: {size} bytes")
+
+    def get_size(self):
+        return self.snapshot.record(self.index)[3]
+
+    def list_files(self):
+        return list(self.iter_files())
+
+    def iter_files(self):
+        snapshot = self.snapshot
+        for index in range(self.index, snapshot.record(self.index)[4]):
+            kind, name, _, _, _ = snapshot.record(index)
+            if kind == FILE:
+                yield name
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    from file_system_component import File
+
+    dir1 = Directory("dir1")
+    dir2 = Directory("dir2")
+    dir1.add(File("file1.txt", 1200))
+    dir1.add(File("file2.txt", 1500))
+    dir2.add(File("file3.txt", 1000))
+    dir1.add(dir2)
+
+    path = os.path.join(tempfile.gettempdir(), "dir1.fssnap")
+    write_snapshot(dir1, path)
+    with Snapshot(path) as snapshot:
+        snapshot.root.display()
+        print(f"Total size of {snapshot.root.name}: {snapshot.root.get_size()} bytes")
+        print(snapshot.root.list_files())
+        print(snapshot.root.children[2].children[0].path)
+    os.remove(path)
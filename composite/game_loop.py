@@ -0,0 +1,64 @@
+import time
+
+import pygame
+
+# A game loop with a fixed simulation step, decoupled from the frame rate.
+# With `update(); render(); clock.tick(60)` the logic runs once per frame, so when drawing gets
+# slow the simulation slows down with it. Here the time that really passed is accumulated and the
+# logic is advanced in fixed steps of `step` seconds - several per frame if rendering fell behind,
+# none if frames are faster than the step. render() then gets alpha in [0, 1): how far the clock
+# is between the last update and the next one, for interpolating positions between two states.
+# If a frame took so long that more than `max_updates` steps are due (a debugger pause, a
+# dragged window), the extra steps are dropped instead of trying to catch up, which would make
+# the next frame even later.
+#
+#   loop = GameLoop(update=world.update, render=draw, handle_events=read_input, step=1 / 60)
+#   loop.run()  # until loop.stop() is called, e.g. from handle_events on QUIT
+class GameLoop:
+    def __init__(self, update, render, handle_events=None, step=1 / 60, max_updates=5, fps=60,
+                 timer=time.perf_counter):
+        self.update = update                # update(step): advance the logic by one step
+        self.render = render                # render(alpha): draw the current state
+        self.handle_events = handle_events  # handle_events(): once per frame, before the updates
+        self.step = step
+        self.max_updates = max_updates
+        self.fps = fps                      # cap on rendered frames per second, 0 for none
+        self.timer = timer
+        self.running = False
+        self.frames = 0
+        self.updates = 0
+        self.dropped_steps = 0
+
+    def stop(self):
+        self.running = False
+
+    def run(self):
+        clock = pygame.time.Clock()
+        self.running = True
+        previous = self.timer()
+        lag = 0.0
+        while self.running:
+            now = self.timer()
+            lag += now - previous
+            previous = now
+
+            if self.handle_events is not None:
+                self.handle_events()
+                if not self.running:
+                    break
+
+            updates = 0
+            while lag >= self.step and updates < self.max_updates:
+                self.update(self.step)
+                lag -= self.step
+                updates += 1
+            self.updates += updates
+            if lag >= self.step:
+                # Too far behind: skip the backlog rather than spiral further behind
+                skipped = int(lag // self.step)
+                self.dropped_steps += skipped
+                lag -= skipped * self.step
+
+            self.render(lag / self.step)
+            self.frames += 1
+            clock.tick(self.fps)
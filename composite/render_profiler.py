@@ -0,0 +1,127 @@
+import time
+from collections import deque
+
+import pygame
+
+# Finds out which part of a Graphic tree costs the most to draw.
+# While recording, the render() method of the Graphic class and every subclass that defines its
+# own is swapped for a wrapper that times each call with perf_counter_ns; stop() puts the original
+# methods back, so a tree that is not being profiled pays nothing. For every call the profiler
+# keeps the path from the root render() down to it, e.g. ("Group", "clock face", "Circle"), and
+# adds the call's self time (its own time minus its children's) to that path. From that it reports:
+#   - time per class (calls, self and total time per frame)
+#   - time per subtree (a path plus everything under it)
+#   - an overlay with both, drawn onto the screen
+#   - a "folded stacks" file ("Group;clock face;Circle 41250" per line, in nanoseconds) that
+#     flamegraph.pl, speedscope or inferno turn into a flame graph
+# A node shows up under its `label` if it has one, otherwise under its class name; give the
+# subtrees you want to tell apart a label (e.g. clock_face.label = "clock face").
+class RenderProfiler:
+    def __init__(self, base_class, history=120):
+        self.base_class = base_class
+        self.frames = 0
+        self.by_class = {}   # class name -> [calls, total ns, self ns]
+        self.folded = {}     # path of labels -> self ns
+        self.frame_times = deque(maxlen=history)  # render ns of the last `history` frames
+        self._stack = []     # [path, ns spent in children] for each render() in progress
+        self._frame_ns = 0
+        self._patched = []   # (class, original render)
+        self._font = None
+
+    @property
+    def recording(self):
+        return bool(self._patched)
+
+    def start(self):
+        if self._patched:
+            return
+        classes = [self.base_class]
+        for cls in classes:
+            classes.extend(cls.__subclasses__())
+        for cls in classes:
+            if "render" in cls.__dict__:
+                self._patched.append((cls, cls.__dict__["render"]))
+                cls.render = self._timed(cls.__dict__["render"])
+
+    def stop(self):
+        for cls, render in self._patched:
+            cls.render = render
+        self._patched = []
+
+    def end_frame(self):
+        # Call once per frame, after drawing; the frame's time is that of its top-level render() calls
+        self.frame_times.append(self._frame_ns)
+        self.frames += 1
+        self._frame_ns = 0
+
+    def _timed(self, render):
+        stack = self._stack
+        by_class = self.by_class
+        folded = self.folded
+        perf_counter_ns = time.perf_counter_ns
+
+        def timed(graphic, surface, offset=(0, 0)):
+            label = getattr(graphic, "label", None) or type(graphic).__name__
+            path = stack[-1][0] + (label,) if stack else (label,)
+            entry = [path, 0]
+            stack.append(entry)
+            start = perf_counter_ns()
+            try:
+                render(graphic, surface, offset)
+            finally:
+                elapsed = perf_counter_ns() - start
+                stack.pop()
+                own = elapsed - entry[1]
+                folded[path] = folded.get(path, 0) + own
+                totals = by_class.setdefault(type(graphic).__name__, [0, 0, 0])
+                totals[0] += 1
+                totals[1] += elapsed
+                totals[2] += own
+                if stack:
+                    stack[-1][1] += elapsed
+                else:
+                    self._frame_ns += elapsed
+        return timed
+
+    def subtree_totals(self):
+        # {path: ns} where each path's time includes everything drawn below it, biggest first
+        totals = {}
+        for path, ns in self.folded.items():
+            for end in range(1, len(path) + 1):
+                totals[path[:end]] = totals.get(path[:end], 0) + ns
+        return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+    def report(self, limit=8):
+        # Lines of text summarising the session, in milliseconds per frame
+        frames = max(self.frames, 1)
+        recent = self.frame_times
+        lines = [f"render: {sum(recent) / max(len(recent), 1) / 1e6:.3f} ms/frame "
+                 f"over the last {len(recent)} of {self.frames} frames"]
+        lines.append("by class (calls, self ms, total ms per frame):")
+        by_self = sorted(self.by_class.items(), key=lambda item: -item[1][2])
+        for name, (calls, total, own) in by_self[:limit]:
+            lines.append(f"  {name:<14}{calls / frames:8.1f}{own / frames / 1e6:9.3f}{total / frames / 1e6:9.3f}")
+        lines.append("by subtree (ms per frame):")
+        for path, ns in list(self.subtree_totals().items())[:limit]:
+            lines.append(f"  {ns / frames / 1e6:7.3f}  {' > '.join(path)}")
+        return lines
+
+    def draw_overlay(self, surface, pos=(8, 8), limit=5):
+        # Draw report() on a dark box; returns the rectangle covered, for pygame.display.update()
+        if self._font is None:
+            pygame.font.init()
+            self._font = pygame.font.Font(None, 18)
+        rendered = [self._font.render(line, True, (255, 255, 0)) for line in self.report(limit)]
+        height = self._font.get_linesize()
+        box = pygame.Rect(pos, (max(text.get_width() for text in rendered) + 8, height * len(rendered) + 8))
+        surface.fill((32, 32, 32), box)
+        for row, text in enumerate(rendered):
+            surface.blit(text, (box.x + 4, box.y + 4 + row * height))
+        return box
+
+    def write_folded(self, path):
+        # Folded stacks, one "frame;frame;frame <self ns>" line per path
+        with open(path, "w", encoding="utf-8") as out:
+            for stack_path, ns in self.folded.items():
+                if ns > 0:
+                    out.write(";".join(name.replace(";", ":") for name in stack_path) + f" {ns}\n")
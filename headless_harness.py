@@ -0,0 +1,208 @@
+import argparse
+import json
+import os
+import random
+import runpy
+import sys
+import time
+
+# Headless benchmark harness for the pygame demos.
+# Each demo is an interactive window with an endless game loop. The harness runs the demo
+# unchanged on SDL's dummy video driver and patches a few pygame entry points around it:
+#   - pygame.event.get / pygame.mouse.* replay a scripted sequence of input per frame
+#   - pygame.display.flip / update mark the end of a frame; after N frames the scene is stopped
+#   - pygame.time.Clock.tick, pygame.time.delay and time.sleep do not wait, so we time the work
+#   - every pygame.draw.* function is counted (Surface.blit is a C method and cannot be counted)
+# and reports frame-time percentiles and draw calls per frame, so rendering changes can be
+# checked in CI without a display:
+#   python headless_harness.py                      # every scene, 300 frames
+#   python headless_harness.py clock --frames 1000 --max-p99 5
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+import pygame
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Scripted input helpers: each returns {frame: [(event type, attributes), ...]}
+def click(frame, pos):
+    return {frame: [(pygame.MOUSEBUTTONDOWN, {"pos": pos, "button": 1}),
+                    (pygame.MOUSEBUTTONUP, {"pos": pos, "button": 1})]}
+
+def drag(first_frame, last_frame, start, end):
+    script = {first_frame: [(pygame.MOUSEBUTTONDOWN, {"pos": start, "button": 1})]}
+    steps = last_frame - first_frame
+    previous = start
+    for step in range(1, steps + 1):
+        pos = (start[0] + (end[0] - start[0]) * step // steps,
+               start[1] + (end[1] - start[1]) * step // steps)
+        rel = (pos[0] - previous[0], pos[1] - previous[1])
+        script[first_frame + step] = [(pygame.MOUSEMOTION, {"pos": pos, "rel": rel, "buttons": (1, 0, 0)})]
+        previous = pos
+    script.setdefault(last_frame + 1, []).append((pygame.MOUSEBUTTONUP, {"pos": end, "button": 1}))
+    return script
+
+def merge(*scripts):
+    merged = {}
+    for script in scripts:
+        for frame, events in script.items():
+            merged.setdefault(frame, []).extend(events)
+    return merged
+
+# A click somewhere new every 5 frames, for the demos that create a shape per click
+SPREAD_CLICKS = merge(*(click(frame, (frame * 7 % 800, frame * 3 % 600)) for frame in range(5, 10_000, 5)))
+
+SCENES = {
+    "clock": ("composite/clock_drag_component.py", drag(10, 100, (400, 300), (600, 400))),
+    "observer": ("observer/observer_pattern.py", drag(10, 100, (400, 300), (200, 150))),
+    "factory_001": ("factory/factory_method_pattern_001.py", SPREAD_CLICKS),
+    "factory_002": ("factory/factory_method_pattern_002.py", SPREAD_CLICKS),
+    "factory_003": ("factory/factory_method_pattern_003.py", SPREAD_CLICKS),
+    "state": ("state/state_pattern_002.py", {}),
+}
+
+class _SceneDone(Exception):
+    pass
+
+class _FakeClock:
+    # Stands in for pygame.time.Clock: never sleeps, so frame times measure the demo's own work
+    def __init__(self):
+        self._last = time.perf_counter()
+
+    def tick(self, framerate=0):
+        now = time.perf_counter()
+        elapsed = int((now - self._last) * 1000)
+        self._last = now
+        return elapsed
+
+    def get_fps(self):
+        return 0.0
+
+class SceneRun:
+    # Replays the script for one scene and collects per-frame measurements
+    def __init__(self, script, frames):
+        self.script = script
+        self.frames = frames
+        self.frame = 0
+        self.mouse_pos = (0, 0)
+        self.mouse_buttons = (False, False, False)
+        self.frame_times = []
+        self.draw_calls = []
+        self._draws = 0
+        self._frame_start = None
+
+    def get_events(self, *args, **kwargs):
+        self._real_event_get()  # keep SDL's own queue drained
+        events = []
+        for event_type, attributes in self.script.get(self.frame, ()):
+            if "pos" in attributes:
+                self.mouse_pos = attributes["pos"]
+            if event_type == pygame.MOUSEBUTTONDOWN:
+                self.mouse_buttons = (True, False, False)
+            elif event_type == pygame.MOUSEBUTTONUP:
+                self.mouse_buttons = (False, False, False)
+            events.append(pygame.event.Event(event_type, attributes))
+        return events
+
+    def count_draw(self, draw_function):
+        def counted(*args, **kwargs):
+            self._draws += 1
+            return draw_function(*args, **kwargs)
+        return counted
+
+    def end_frame(self, present):
+        def wrapped(*args, **kwargs):
+            result = present(*args, **kwargs)
+            now = time.perf_counter()
+            # Frame 0 includes window creation and setup; it is not measured
+            if self._frame_start is not None:
+                self.frame_times.append(now - self._frame_start)
+                self.draw_calls.append(self._draws)
+            self._frame_start = now
+            self._draws = 0
+            self.frame += 1
+            if self.frame > self.frames:
+                raise _SceneDone
+            return result
+        return wrapped
+
+    def run(self, path):
+        patches = [
+            (pygame.event, "get", self.get_events),
+            (pygame.mouse, "get_pos", lambda: self.mouse_pos),
+            (pygame.mouse, "get_pressed", lambda *args: self.mouse_buttons),
+            (pygame.display, "flip", self.end_frame(pygame.display.flip)),
+            (pygame.display, "update", self.end_frame(pygame.display.update)),
+            (pygame.time, "Clock", _FakeClock),
+            (pygame.time, "delay", lambda ms: 0),
+            (pygame.time, "wait", lambda ms: 0),
+            (pygame, "quit", lambda: None),
+            (time, "sleep", lambda seconds: None),
+        ]
+        patches += [(pygame.draw, name, self.count_draw(getattr(pygame.draw, name)))
+                    for name in dir(pygame.draw) if not name.startswith("_")
+                    and callable(getattr(pygame.draw, name))]
+        self._real_event_get = pygame.event.get
+        originals = [(module, name, getattr(module, name)) for module, name, _ in patches]
+        for module, name, replacement in patches:
+            setattr(module, name, replacement)
+        # Let the demo import its neighbours, as it would when run from its own folder
+        sys.path.insert(0, os.path.dirname(path))
+        random.seed(0)
+        try:
+            runpy.run_path(path, run_name="__main__")
+        except _SceneDone:
+            pass
+        finally:
+            sys.path.remove(os.path.dirname(path))
+            for module, name, original in originals:
+                setattr(module, name, original)
+            pygame.quit()
+        if len(self.frame_times) < self.frames:
+            raise RuntimeError(f"{path} stopped after {len(self.frame_times)} of {self.frames} frames")
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def summarize(name, run):
+    times = sorted(run.frame_times)
+    return {
+        "scene": name,
+        "frames": len(times),
+        "p50_ms": percentile(times, 0.50) * 1e3,
+        "p90_ms": percentile(times, 0.90) * 1e3,
+        "p99_ms": percentile(times, 0.99) * 1e3,
+        "max_ms": times[-1] * 1e3,
+        "draw_calls_per_frame": sum(run.draw_calls) / len(run.draw_calls),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the pygame demos headless and report frame times.")
+    parser.add_argument("scenes", nargs="*", help=f"scenes to run (default: all of {', '.join(SCENES)})")
+    parser.add_argument("--frames", type=int, default=300, help="frames to run per scene")
+    parser.add_argument("--max-p99", type=float, help="fail if any scene's p99 frame time exceeds this (ms)")
+    parser.add_argument("--json", action="store_true", help="print one JSON object per scene")
+    args = parser.parse_args()
+    unknown = [name for name in args.scenes if name not in SCENES]
+    if unknown:
+        parser.error(f"unknown scene(s): {', '.join(unknown)}")
+
+    failed = False
+    for name in args.scenes or list(SCENES):
+        path, script = SCENES[name]
+        run = SceneRun(script, args.frames)
+        run.run(os.path.join(ROOT, path))
+        result = summarize(name, run)
+        if args.json:
+            print(json.dumps(result))
+        else:
+            print(f"{name:12} {result['frames']:5} frames  p50 {result['p50_ms']:7.3f} ms  "
+                  f"p90 {result['p90_ms']:7.3f} ms  p99 {result['p99_ms']:7.3f} ms  "
+                  f"max {result['max_ms']:7.3f} ms  {result['draw_calls_per_frame']:7.1f} draws/frame")
+        if args.max_p99 is not None and result["p99_ms"] > args.max_p99:
+            failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+import io
+import random
+import sys
+import time
+
+from observer_exercises import Inventory, StoreManager
+
+# Benchmarks for the Exercise 1 Inventory. Run from the observer folder:
+#   python inventory_benchmark.py feed [rows]  - a stock feed row by row (update_stock) versus in
+#                                                one batch (update_stock_many), from a list and CSV
+#   python inventory_benchmark.py thresholds   - low-stock alerts from the threshold index versus
+#                                                every observer checking its own threshold
+
+
+class CountingManager(StoreManager):
+    # A store manager that only counts what it is told, so the benchmark measures the inventory
+    def __init__(self, name):
+        super().__init__(name)
+        self.calls = 0
+        self.changes = 0
+
+    def update(self, product_name, new_stock):
+        self.calls += 1
+        self.changes += 1
+
+    def update_many(self, changes):
+        self.calls += 1
+        self.changes += len(changes)
+
+
+def make_feed(rows, products, seed=1):
+    rng = random.Random(seed)
+    return [(f"SKU-{rng.randrange(products)}", rng.randrange(1000)) for _ in range(rows)]
+
+
+def make_inventory(products, observers):
+    inventory = Inventory()
+    inventory._products = {f"SKU-{i}": 500 for i in range(products)}
+    managers = [CountingManager(f"manager {i}") for i in range(observers)]
+    for manager in managers:
+        inventory.attach(manager)
+    return inventory, managers
+
+
+def bench(rows=1_000_000, products=10_000, observers=10):
+    feed = make_feed(rows, products)
+    csv_text = "product,stock\n" + "".join(f"{name},{stock}\n" for name, stock in feed)
+
+    inventory, managers = make_inventory(products, observers)
+    start = time.perf_counter()
+    for product_name, new_stock in feed:
+        inventory.update_stock(product_name, new_stock)
+    per_row = time.perf_counter() - start
+    per_row_calls = managers[0].calls
+    final_stock = dict(inventory._products)
+
+    inventory, managers = make_inventory(products, observers)
+    start = time.perf_counter()
+    inventory.update_stock_many(feed)
+    batched = time.perf_counter() - start
+    assert inventory._products == final_stock
+
+    inventory, managers = make_inventory(products, observers)
+    start = time.perf_counter()
+    inventory.update_stock_many(io.StringIO(csv_text))
+    from_csv = time.perf_counter() - start
+    assert inventory._products == final_stock
+
+    print(f"{rows:,} rows over {products:,} products, {observers} observers:")
+    print(f"  update_stock per row    : {per_row:6.2f} s, {per_row_calls:,} notifications per observer")
+    print(f"  update_stock_many (list): {batched:6.2f} s, 1 notification per observer "
+          f"with {managers[0].changes:,} products")
+    print(f"  update_stock_many (CSV) : {from_csv:6.2f} s")
+
+
+class ThresholdManager(CountingManager):
+    # The old way: attached to everything, each manager compares the stock with its own threshold
+    def __init__(self, name, product_name, threshold):
+        super().__init__(name)
+        self.product_name = product_name
+        self.threshold = threshold
+        self.alerts = 0
+
+    def update(self, product_name, new_stock):
+        self.calls += 1
+        if product_name == self.product_name and new_stock < self.threshold:
+            self.alerts += 1
+
+
+def bench_thresholds(observers=100_000, products=1_000, updates=1_000, seed=1):
+    rng = random.Random(seed)
+    subscriptions = [(f"SKU-{rng.randrange(products)}", rng.randrange(1000)) for _ in range(observers)]
+    feed = [(f"SKU-{rng.randrange(products)}", rng.randrange(1000)) for _ in range(updates)]
+
+    inventory = Inventory()
+    inventory._products = {f"SKU-{i}": 1000 for i in range(products)}
+    managers = [ThresholdManager(f"manager {i}", product_name, threshold)
+                for i, (product_name, threshold) in enumerate(subscriptions)]
+    for manager in managers:
+        inventory.attach(manager)
+    start = time.perf_counter()
+    for product_name, new_stock in feed:
+        inventory.update_stock(product_name, new_stock)
+    filtering = time.perf_counter() - start
+    filtered_calls = sum(manager.calls for manager in managers)
+
+    inventory = Inventory()
+    inventory._products = {f"SKU-{i}": 1000 for i in range(products)}
+    managers = [CountingManager(f"manager {i}") for i in range(observers)]
+    for manager, (product_name, threshold) in zip(managers, subscriptions):
+        inventory.set_threshold(manager, product_name, threshold)
+    start = time.perf_counter()
+    for product_name, new_stock in feed:
+        inventory.update_stock(product_name, new_stock)
+    indexed = time.perf_counter() - start
+    indexed_calls = sum(manager.calls for manager in managers)
+
+    print(f"{updates:,} stock updates, {observers:,} observers with one threshold each on {products:,} products:")
+    print(f"  every observer checks : {filtering * 1e3 / updates:8.3f} ms per update, {filtered_calls:,} update() calls")
+    print(f"  threshold index       : {indexed * 1e3 / updates:8.3f} ms per update, {indexed_calls:,} update() calls")
+
+
+if __name__ == "__main__":
+    which = sys.argv[1] if len(sys.argv) > 1 else "feed"
+    if which == "feed":
+        bench(int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000)
+    elif which == "thresholds":
+        bench_thresholds()
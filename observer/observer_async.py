@@ -0,0 +1,152 @@
+#%% Asyncio version of the Exercise 1 inventory
+# Inventory.notify in observer_exercises.py calls every observer in turn, so one slow observer
+# holds up update_stock for everybody. AsyncInventory gives each observer its own bounded queue
+# and worker task instead:
+#   - notify() only puts the change on each observer's queue, and the workers deliver them
+#     concurrently, in order per observer
+#   - an observer's update() may be a coroutine (async def) or a plain function; plain ones run in
+#     a worker thread (asyncio.to_thread) so they cannot block the event loop either
+#   - when an observer falls `maxsize` changes behind, its overflow policy decides what happens:
+#       "block"       - notify() waits for room (backpressure on the producer)
+#       "drop_oldest" - the oldest queued change is discarded, notify() never waits
+#       "drop_newest" - the new change is discarded, notify() never waits
+# attach() must be called while the event loop is running (it starts the observer's worker task).
+import asyncio
+import inspect
+from abc import ABC, abstractmethod
+
+
+class AsyncObserver(ABC):
+    @abstractmethod
+    async def update(self, product_name: str, new_stock: int) -> None:
+        pass
+
+
+class AsyncSubject(ABC):
+    @abstractmethod
+    def attach(self, observer, maxsize: int = 100, overflow: str = "block") -> None:
+        pass
+
+    @abstractmethod
+    def detach(self, observer) -> None:
+        pass
+
+    @abstractmethod
+    async def notify(self, product_name: str, new_stock: int) -> None:
+        pass
+
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "drop_newest")
+
+
+# One attached observer: its queue, its worker task and what went wrong delivering to it
+class _Subscription:
+    def __init__(self, observer, maxsize, overflow):
+        self.observer = observer
+        self.overflow = overflow
+        self.queue = asyncio.Queue(maxsize)
+        self.dropped = 0
+        self.errors = []
+        self.task = asyncio.get_running_loop().create_task(self._deliver())
+
+    async def _deliver(self):
+        while True:
+            product_name, new_stock = await self.queue.get()
+            try:
+                if inspect.iscoroutinefunction(self.observer.update):
+                    await self.observer.update(product_name, new_stock)
+                else:
+                    await asyncio.to_thread(self.observer.update, product_name, new_stock)
+            except Exception as error:
+                # A failing observer must not stop the deliveries to itself or anybody else
+                self.errors.append(error)
+            finally:
+                self.queue.task_done()
+
+    async def put(self, change):
+        if self.overflow == "block":
+            await self.queue.put(change)
+            return
+        if self.queue.full():
+            self.dropped += 1
+            if self.overflow == "drop_newest":
+                return
+            self.queue.get_nowait()
+            self.queue.task_done()
+        self.queue.put_nowait(change)
+
+
+class AsyncInventory(AsyncSubject):
+    def __init__(self):
+        self._subscriptions = {}  # observer -> _Subscription, in attach order
+        self._products = {}
+
+    def attach(self, observer, maxsize: int = 100, overflow: str = "block") -> None:
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"unknown overflow policy {overflow!r}, expected one of {', '.join(OVERFLOW_POLICIES)}")
+        if observer in self._subscriptions:
+            raise ValueError("observer is already attached")
+        self._subscriptions[observer] = _Subscription(observer, maxsize, overflow)
+
+    def detach(self, observer) -> None:
+        # Changes still queued for the observer are not delivered; call drain() first to wait for them
+        self._subscriptions.pop(observer).task.cancel()
+
+    async def notify(self, product_name: str, new_stock: int) -> None:
+        for subscription in list(self._subscriptions.values()):
+            await subscription.put((product_name, new_stock))
+
+    async def update_stock(self, product_name: str, new_stock: int) -> None:
+        # Same rule as Inventory.update_stock: only a drop in stock is reported
+        if product_name in self._products:
+            if self._products[product_name] > new_stock:
+                await self.notify(product_name, new_stock)
+        self._products[product_name] = new_stock
+
+    async def drain(self) -> None:
+        # Wait until every queued change has been delivered
+        await asyncio.gather(*(subscription.queue.join() for subscription in self._subscriptions.values()))
+
+    async def close(self) -> None:
+        await self.drain()
+        for observer in list(self._subscriptions):
+            self.detach(observer)
+
+    def stats(self, observer):
+        # (changes waiting, changes dropped, exceptions raised) for one observer
+        subscription = self._subscriptions[observer]
+        return subscription.queue.qsize(), subscription.dropped, list(subscription.errors)
+
+
+class AsyncStoreManager(AsyncObserver):
+    def __init__(self, name: str, delay: float = 0.0):
+        self._name = name
+        self._delay = delay  # simulated time to handle one notification, e.g. a network call
+
+    async def update(self, product_name: str, new_stock: int) -> None:
+        await asyncio.sleep(self._delay)
+        print(f'the stock level {new_stock} for the product {product_name} has gone below the threshold and {self._name} has been notified.')
+
+
+if __name__ == "__main__":
+    import time
+
+    async def main():
+        inventory = AsyncInventory()
+        inventory._products = {"Apples": 100, "Oranges": 100, "Bananas": 100}
+        alice = AsyncStoreManager("Alice")
+        bob = AsyncStoreManager("Bob", delay=0.2)  # slow subscriber
+        inventory.attach(alice)
+        inventory.attach(bob, maxsize=2, overflow="drop_oldest")
+
+        # Five stock drops: Bob can only keep up with a few, but update_stock never waits for him
+        start = time.perf_counter()
+        for new_stock in range(90, 40, -10):
+            await inventory.update_stock("Apples", new_stock)
+        print(f"5 updates took {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        await inventory.drain()
+        print(f"Bob: waiting, dropped, errors = {inventory.stats(bob)}")
+        await inventory.close()
+
+    asyncio.run(main())
@@ -0,0 +1,155 @@
+#%% Dispatch strategies for notifying observers
+# A subject hands each (observer, arguments) pair to a dispatcher, which decides where
+# observer.update(*arguments) runs:
+#   InlineDispatcher       - right away, on the caller's thread (the classic observer loop)
+#   ThreadPoolDispatcher   - on a pool of threads: good for observers that wait on I/O
+#   ProcessPoolDispatcher  - on a pool of processes: good for CPU-heavy observers (report
+#                            generation). The observer and the arguments are pickled and update()
+#                            runs on a copy, so changes it makes to its own attributes are not seen
+#                            by the caller: use it for observers whose work has side effects elsewhere
+# Every dispatcher guarantees that:
+#   - one observer receives its updates in the order they were dispatched; the pools run at most
+#     one update per observer at a time, different observers run in parallel
+#   - an exception raised by update() is caught and recorded in `errors` as (observer, exception);
+#     it never reaches the subject or stops the other observers
+#   - flush() waits until every dispatched update has finished
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+def _call_update(observer, arguments):
+    # Module level so a process pool can pickle it
+    observer.update(*arguments)
+
+
+class InlineDispatcher:
+    def __init__(self):
+        self.errors = []
+
+    def dispatch(self, observer, arguments) -> None:
+        try:
+            observer.update(*arguments)
+        except Exception as error:
+            self.errors.append((observer, error))
+
+    def flush(self) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+
+class PoolDispatcher:
+    # Runs updates on a concurrent.futures executor. Each observer with work outstanding has a
+    # lane: a queue of the arguments still waiting for it. Only the head of a lane is submitted to
+    # the executor; when it finishes, the next one is submitted, which keeps each observer's
+    # updates in order without holding a worker while it waits. If the executor refuses the next
+    # update of a lane (it was shut down, or a process pool broke because a worker died), the rest
+    # of that lane is dropped and the refusal is recorded in `errors`, so flush() still returns
+    def __init__(self, executor):
+        self._executor = executor
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._lanes = {}   # observer -> deque of arguments dispatched after the running update
+        self._pending = 0  # updates dispatched and not finished yet
+        self.errors = []
+
+    def dispatch(self, observer, arguments) -> None:
+        # Raises whatever the executor raises when it refuses work (e.g. RuntimeError after
+        # shutdown()); the update is then not counted, so flush() never waits for it
+        with self._lock:
+            lane = self._lanes.get(observer)
+            if lane is not None:
+                lane.append(arguments)
+                self._pending += 1
+                return
+            future = self._executor.submit(_call_update, observer, arguments)
+            self._lanes[observer] = deque()
+            self._pending += 1
+        self._watch(observer, future)
+
+    def _watch(self, observer, future):
+        future.add_done_callback(lambda finished: self._finished(observer, finished))
+
+    def _finished(self, observer, future):
+        error = future.exception()
+        with self._lock:
+            if error is not None:
+                self.errors.append((observer, error))
+            self._pending -= 1
+            lane = self._lanes[observer]
+            if lane:
+                arguments = lane.popleft()
+            else:
+                del self._lanes[observer]
+                arguments = None
+            if not self._pending:
+                self._idle.notify_all()
+        if arguments is None:
+            return
+        try:
+            future = self._executor.submit(_call_update, observer, arguments)
+        except Exception as error:
+            # The executor is gone or broken (e.g. a worker process died): give up on this
+            # observer's lane, record why, and stop counting its updates so flush() returns
+            with self._lock:
+                self.errors.append((observer, error))
+                self._pending -= 1 + len(self._lanes.pop(observer))
+                if not self._pending:
+                    self._idle.notify_all()
+            return
+        self._watch(observer, future)
+
+    def flush(self) -> None:
+        with self._idle:
+            self._idle.wait_for(lambda: not self._pending)
+
+    def shutdown(self) -> None:
+        self.flush()
+        self._executor.shutdown()
+
+
+class ThreadPoolDispatcher(PoolDispatcher):
+    def __init__(self, workers: int = 4):
+        super().__init__(ThreadPoolExecutor(max_workers=workers))
+
+
+class ProcessPoolDispatcher(PoolDispatcher):
+    def __init__(self, workers: int = None):
+        super().__init__(ProcessPoolExecutor(max_workers=workers))
+
+
+if __name__ == "__main__":
+    import time
+    from observer_exercises import WeatherData
+
+    # Three displays that each take 0.1 s to publish a reading (e.g. an upload), and one that fails
+    class SlowDisplay:
+        def __init__(self, name):
+            self.name = name
+            self.readings = []
+
+        def update(self, temperature, humidity, pressure):
+            time.sleep(0.1)
+            self.readings.append(temperature)
+
+    class BrokenDisplay:
+        def update(self, temperature, humidity, pressure):
+            raise RuntimeError("display offline")
+
+    for dispatcher in (InlineDispatcher(), ThreadPoolDispatcher(workers=4)):
+        weather_data = WeatherData(dispatcher)
+        displays = [SlowDisplay(f"display {i}") for i in range(3)]
+        for display in displays:
+            weather_data.attach(display)
+        weather_data.attach(BrokenDisplay())
+        start = time.perf_counter()
+        for temperature in range(20, 25):
+            weather_data.set_measurements(temperature, 80, 30)
+        returned = time.perf_counter() - start
+        weather_data.flush()
+        done = time.perf_counter() - start
+        print(f"{type(dispatcher).__name__}: 5 readings returned after {returned:.2f} s, all delivered "
+              f"after {done:.2f} s; display 0 saw {displays[0].readings}, {len(dispatcher.errors)} errors")
+        dispatcher.shutdown()
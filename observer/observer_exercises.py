@@ -1,5 +1,8 @@
 #%% Exercise 1
+import csv
+from bisect import bisect_left, bisect_right
 from abc import ABC, abstractmethod
+from typing import Iterable
 
 
 class Observer(ABC):
@@ -7,6 +10,12 @@ class Observer(ABC):
     def update(self, product_name: str, new_stock: int) -> None:
         pass
 
+    def update_many(self, changes: list) -> None:
+        # One batch from Inventory.update_stock_many: [(product_name, new_stock), ...].
+        # Override it to handle a whole batch at once; by default each change goes to update()
+        for product_name, new_stock in changes:
+            self.update(product_name, new_stock)
+
 
 class Subject(ABC):
     @abstractmethod
@@ -31,31 +40,233 @@ class StoreManager(Observer):
         print(f'the stock level {new_stock} for the product {product_name} has gone below the threshold and {self._name} has been notified.')
 
 # Publisher-Subject class
+# Observers can subscribe to everything, or only to some products: exact product names and/or
+# name prefixes (e.g. "SKU-12" for every product whose name starts with it). Topics are kept in
+# dict-of-sets indexes (topic -> observers), so a change only touches the observers interested in
+# that product instead of every attached observer. An observer attached to everything and also to
+# some topics still gets each drop once.
+# Observers can also ask to hear about a product only when its stock falls below their own
+# threshold (set_threshold). Each product keeps its thresholds sorted, so a drop from old to new
+# stock finds exactly the observers with new < threshold <= old by binary search: O(log n + k)
+# for k alerts, instead of calling every observer to let it compare.
+# A threshold only adds alerts for drops the observer would not hear about anyway: an observer
+# attached to everything, to the product or to one of its prefixes already gets every drop of that
+# product, so its threshold there is ignored and it is never notified twice about the same drop.
 class Inventory(Subject):
     def __init__(self):
-        self._observers = []
+        self._observers = []        # observers attached to every product
+        self._by_product = {}       # product name -> observers attached to that product
+        self._by_prefix = {}        # name prefix -> observers attached to that prefix
+        self._prefix_lengths = {}   # length -> number of indexed prefixes that long
+        self._topics = {}           # observer -> (product names, prefixes) it is attached to
+        self._thresholds = {}       # product name -> ([thresholds, ascending], [observer per threshold])
+        self._observer_thresholds = {}  # observer -> {product name: threshold}
         self._products = {}
 
-    def attach(self, observer: Observer) -> None:
+    def attach(self, observer: Observer, products: Iterable[str] = (), prefixes: Iterable[str] = ()) -> None:
         # TODO: Implement the attach method to add an observer
-        self._observers.append(observer)
+        products, prefixes = set(products), set(prefixes)
+        if not products and not prefixes:
+            self._observers.append(observer)
+            return
+        old_products, old_prefixes = self._topics.setdefault(observer, (set(), set()))
+        for product_name in products - old_products:
+            self._by_product.setdefault(product_name, set()).add(observer)
+        for prefix in prefixes - old_prefixes:
+            observers = self._by_prefix.setdefault(prefix, set())
+            if not observers:
+                self._prefix_lengths[len(prefix)] = self._prefix_lengths.get(len(prefix), 0) + 1
+            observers.add(observer)
+        old_products |= products
+        old_prefixes |= prefixes
 
     def detach(self, observer: Observer) -> None:
         # TODO: Implement the detach method to remove an observer
-        self._observers.remove(observer)
+        # Removes every subscription of the observer: all products, topics and thresholds
+        attached = False
+        if observer in self._observers:
+            self._observers.remove(observer)
+            attached = True
+        if observer in self._topics:
+            products, prefixes = self._topics.pop(observer)
+            for product_name in products:
+                self._unindex(self._by_product, product_name, observer)
+            for prefix in prefixes:
+                if self._unindex(self._by_prefix, prefix, observer):
+                    self._prefix_lengths[len(prefix)] -= 1
+                    if not self._prefix_lengths[len(prefix)]:
+                        del self._prefix_lengths[len(prefix)]
+            attached = True
+        if observer in self._observer_thresholds:
+            for product_name in list(self._observer_thresholds[observer]):
+                self.clear_threshold(observer, product_name)
+            attached = True
+        if not attached:
+            raise ValueError("observer is not attached")
+
+    def set_threshold(self, observer: Observer, product_name: str, threshold: int) -> None:
+        # Call observer.update() whenever product_name's stock drops from threshold or more to
+        # below it. Replaces the observer's previous threshold for that product
+        if product_name in self._observer_thresholds.get(observer, ()):
+            self.clear_threshold(observer, product_name)
+        thresholds, observers = self._thresholds.setdefault(product_name, ([], []))
+        index = bisect_right(thresholds, threshold)
+        thresholds.insert(index, threshold)
+        observers.insert(index, observer)
+        self._observer_thresholds.setdefault(observer, {})[product_name] = threshold
+
+    def clear_threshold(self, observer: Observer, product_name: str) -> None:
+        threshold = self._observer_thresholds[observer].pop(product_name)
+        if not self._observer_thresholds[observer]:
+            del self._observer_thresholds[observer]
+        thresholds, observers = self._thresholds[product_name]
+        # Among the entries with the same threshold, find this observer's
+        index = bisect_left(thresholds, threshold)
+        while observers[index] is not observer:
+            index += 1
+        del thresholds[index]
+        del observers[index]
+        if not thresholds:
+            del self._thresholds[product_name]
+
+    def _crossed(self, product_name: str, old_stock: int, new_stock: int, broadcast: set = None) -> list:
+        # Observers whose threshold for product_name is in (new_stock, old_stock], leaving out the
+        # ones notified of every drop of product_name anyway. `broadcast` is set(self._observers),
+        # for callers that check many drops
+        entry = self._thresholds.get(product_name)
+        if entry is None:
+            return []
+        thresholds, observers = entry
+        crossed = observers[bisect_right(thresholds, new_stock):bisect_right(thresholds, old_stock)]
+        if crossed and (self._observers or self._topics):
+            if broadcast is None:
+                broadcast = set(self._observers)
+            crossed = [observer for observer in crossed
+                       if observer not in broadcast and not self._follows_topic(observer, product_name)]
+        return crossed
+
+    def _follows_topic(self, observer: Observer, product_name: str) -> bool:
+        # True if observer is attached to product_name or to one of its prefixes
+        topics = self._topics.get(observer)
+        if topics is None:
+            return False
+        products, prefixes = topics
+        return product_name in products or any(product_name.startswith(prefix) for prefix in prefixes)
+
+    @staticmethod
+    def _unindex(index, topic, observer):
+        # Remove observer from index[topic]; True if that was the topic's last observer
+        observers = index[topic]
+        observers.discard(observer)
+        if not observers:
+            del index[topic]
+            return True
+        return False
+
+    def observers_for(self, product_name: str) -> list:
+        # Everyone interested in product_name
+        if not self._topics:
+            return list(self._observers)
+        return self._observers + list(self._topic_observers(product_name))
+
+    def _topic_observers(self, product_name: str, broadcast: set = None) -> set:
+        # Observers attached to product_name or one of its prefixes, each once: one lookup for
+        # the name and one per distinct prefix length, instead of a pass over all observers.
+        # Observers also attached to everything are left out, as they hear about every drop
+        # anyway; `broadcast` is set(self._observers), for callers that check many products
+        interested = set()
+        observers = self._by_product.get(product_name)
+        if observers:
+            interested.update(observers)
+        for length in self._prefix_lengths:
+            observers = self._by_prefix.get(product_name[:length]) if length <= len(product_name) else None
+            if observers:
+                interested.update(observers)
+        if interested and self._observers:
+            interested -= broadcast if broadcast is not None else set(self._observers)
+        return interested
 
     def notify(self, product_name, new_stock) -> None:
         # TODO: Implement the notify method to notify all observers
-        for observer in self._observers:
+        for observer in self.observers_for(product_name):
             observer.update(product_name, new_stock)
 
     def update_stock(self, product_name: str, new_stock: int) -> None:
         # TODO: Implement the update_stock method to update the stock level and call notify if necessary
         if product_name in self._products:
-            if self._products[product_name] > new_stock:
+            old_stock = self._products[product_name]
+            if old_stock > new_stock:
                 self.notify(product_name, new_stock)
+                for observer in self._crossed(product_name, old_stock, new_stock):
+                    observer.update(product_name, new_stock)
         self._products[product_name] = new_stock
 
+    def update_stock_many(self, changes) -> dict:
+        # Apply many stock levels in one pass: `changes` is an iterable of (product_name, new_stock)
+        # or a text stream of CSV rows "product_name,new_stock" (blank lines are skipped, and so is
+        # a first row whose stock is not a number: the header). Rows are applied in order with the
+        # same rule as update_stock, but instead of one notification per drop every interested
+        # observer gets a single update_many() call at the end, with one (product_name, new_stock)
+        # per product that dropped: the stock after its last drop in the batch. A threshold
+        # observer's batch also has the products whose thresholds it crossed (at any row of the feed).
+        # A bad row raises ValueError; the rows before it stay applied, and the drops they caused
+        # are still delivered before the error propagates.
+        # Returns {product_name: new_stock} for the products that dropped.
+        if hasattr(changes, "read"):
+            changes = self._read_csv(changes)
+        products = self._products
+        thresholds = self._thresholds
+        drops = {}
+        alerts = {}  # threshold observer -> {product_name: new_stock}
+        broadcast = set(self._observers)
+        try:
+            for product_name, new_stock in changes:
+                old_stock = products.get(product_name)
+                if old_stock is not None and old_stock > new_stock:
+                    drops[product_name] = new_stock
+                    if product_name in thresholds:
+                        for observer in self._crossed(product_name, old_stock, new_stock, broadcast):
+                            alerts.setdefault(observer, {})[product_name] = new_stock
+                products[product_name] = new_stock
+        finally:
+            if drops:
+                self._deliver_batches(drops, alerts)
+        return drops
+
+    def _deliver_batches(self, drops, alerts):
+        # Observers of every product share one batch; topic observers get only their products,
+        # plus the products where only their threshold was crossed
+        batches = {}
+        if self._topics:
+            broadcast = set(self._observers)
+            for product_name, new_stock in drops.items():
+                for observer in self._topic_observers(product_name, broadcast):
+                    batches.setdefault(observer, []).append((product_name, new_stock))
+        for observer, crossed in alerts.items():
+            batches.setdefault(observer, []).extend(crossed.items())
+        everything = list(drops.items())
+        for observer in self._observers:
+            observer.update_many(everything)
+        for observer, batch in batches.items():
+            observer.update_many(batch)
+
+    @staticmethod
+    def _read_csv(stream):
+        rows = csv.reader(stream)
+        header = True  # the first non-empty row may be a header
+        for row in rows:
+            try:
+                product_name, new_stock = row
+                new_stock = int(new_stock)
+            except ValueError:
+                if not row:
+                    continue
+                if header:
+                    header = False
+                    continue
+                raise ValueError(f"line {rows.line_num}: expected product_name,new_stock, got {row!r}") from None
+            header = False
+            yield product_name, new_stock
 
 if __name__ == "__main__":
     inventory = Inventory()
@@ -87,31 +298,68 @@ if __name__ == "__main__":
     print("\nStock level update 3:")
     inventory.update_stock("Oranges", 20)  # Should notify only manager2
 
+    # A manager who only follows apples and every product starting with "Ban"
+    manager3 = StoreManager("Carol")
+    inventory.attach(manager3, products=["Apples"], prefixes=["Ban"])
+    print("\nStock level update 4:")
+    inventory.update_stock("Bananas", 40)  # Should notify manager2 and manager3
+    print("\nStock level update 5:")
+    inventory.update_stock("Oranges", 10)  # Should notify only manager2
+
+    # A stock feed in one go: each manager gets one batch with the products it follows that dropped
+    print("\nStock feed:")
+    import io
+    feed = io.StringIO("product,stock\nApples,4\nOranges,12\nBananas,30\nApples,3\n")
+    inventory.update_stock_many(feed)  # manager2: Apples and Bananas, manager3: Apples and Bananas
+
+    # Dave only wants to hear when oranges fall below 8 or apples below 2
+    manager4 = StoreManager("Dave")
+    inventory.set_threshold(manager4, "Oranges", 8)
+    inventory.set_threshold(manager4, "Apples", 2)
+    print("\nStock level update 6:")
+    inventory.update_stock("Oranges", 9)  # Should notify manager2 only
+    print("\nStock level update 7:")
+    inventory.update_stock("Oranges", 7)  # Should notify manager2 and manager4
+
 #%% Exercise 2
 # Subject class - Publisher
 from abc import ABC, abstractmethod
 
+from observer_dispatch import InlineDispatcher
+
 class Observer(ABC):
     @abstractmethod
     def update(self, temperature, humidity, pressure):
         pass
     
+# Observers are notified through a dispatcher (see observer_dispatch.py): inline by default, or a
+# thread/process pool so slow observers do not hold up set_measurements(). A dispatcher can be
+# chosen for the whole subject or for a single observer when attaching it.
 class WeatherData:
-    def __init__(self):
+    def __init__(self, dispatcher=None):
         self.temperature = None
         self.humidity = None
         self.pressure = None
         self._observers = []
+        self.dispatcher = dispatcher if dispatcher is not None else InlineDispatcher()
+        self._dispatchers = {}  # observer -> its own dispatcher, if it has one
     def set_measurements(self, temperature, humidity, pressure):
         self.temperature = temperature
         self.humidity = humidity
         self.pressure = pressure
         self.notify_observers()
     def notify_observers(self):
+        arguments = (self.temperature, self.humidity, self.pressure)
         for observer in self._observers:
-            observer.update(self.temperature, self.humidity, self.pressure)
-    def attach(self, observer:Observer):
+            self._dispatchers.get(observer, self.dispatcher).dispatch(observer, arguments)
+    def attach(self, observer:Observer, dispatcher=None):
         self._observers.append(observer)
+        if dispatcher is not None:
+            self._dispatchers[observer] = dispatcher
+    def flush(self):
+        # Wait until every notification sent so far has been handled
+        for dispatcher in {id(d): d for d in [self.dispatcher, *self._dispatchers.values()]}.values():
+            dispatcher.flush()
 
 class CurrentConditionsDisplay(Observer):
     def update(self, temperature, humidity, pressure):
@@ -124,11 +372,13 @@ class ForecastDisplay(Observer):
         print(f'Forecast for tomorrow: temperature is {temperature}, humidity is {humidity}, pressure is {pressure}')       
 
 # test
-weather_data = WeatherData()
-current_condition = CurrentConditionsDisplay()
-statistics_display = StatisticsDisplay()
-forecast_display = ForecastDisplay()
-weather_data.attach(current_condition) 
-weather_data.attach(statistics_display) 
-weather_data.attach(forecast_display)
-weather_data.set_measurements(20, 80, 30)
+if __name__ == "__main__":
+    weather_data = WeatherData()
+    current_condition = CurrentConditionsDisplay()
+    statistics_display = StatisticsDisplay()
+    forecast_display = ForecastDisplay()
+    weather_data.attach(current_condition)
+    weather_data.attach(statistics_display)
+    weather_data.attach(forecast_display)
+    weather_data.set_measurements(20, 80, 30)
+